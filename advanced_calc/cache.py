@@ -0,0 +1,364 @@
+"""Caches shared by the calculus classes"""
+
+from collections import OrderedDict
+import atexit
+import os
+import pickle
+import threading
+import time
+import sympy as sp
+from advanced_calc.metrics import stage
+from advanced_calc.timeout import map_with_budget
+
+
+class LRUCache:
+    """A size-bounded least recently used cache with hit/miss counters"""
+
+    def __init__(self, maxsize=128):
+        """Initialize an empty cache.
+
+        Parameters
+        ==========
+            maxsize : `int`, `optional`
+                The maximum number of entries. ``None`` means unbounded.
+                Defaults to 128.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__data = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get a cached value and mark it as recently used.
+
+        Parameters
+        ==========
+            key : `hashable`
+                The key of the entry.
+            default : `object`, `optional`
+                The value returned on a miss. Defaults to None.
+
+        Returns
+        =======
+            object
+                The cached value, or ``default`` if the key is missing.
+        """
+        with self.__lock:
+            if key not in self.__data:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.__data.move_to_end(key)
+            return self.__data[key]
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry if full.
+
+        Parameters
+        ==========
+            key : `hashable`
+                The key of the entry.
+            value : `object`
+                The value to cache.
+        """
+        with self.__lock:
+            self.__data[key] = value
+            self.__data.move_to_end(key)
+            if self.maxsize is not None and len(self.__data) > self.maxsize:
+                self.__data.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self.__lock:
+            self.__data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Get the cache statistics.
+
+        Returns
+        =======
+            dict
+                The hits, misses, current size and maximum size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.__data),
+            "maxsize": self.maxsize,
+        }
+
+    def __contains__(self, key):
+        """Check if a key is cached without touching the counters."""
+        return key in self.__data
+
+    def __len__(self):
+        """Get the number of cached entries."""
+        return len(self.__data)
+
+
+# Derivatives keyed by (srepr of the expression, variable name, order).
+DERIVATIVE_CACHE = LRUCache(maxsize=1024)
+
+# One-sided limits keyed by (srepr of the expression, variable name,
+# srepr of the point, direction).
+LIMIT_CACHE = LRUCache(maxsize=4096)
+
+
+def cached_limits(requests, budget=None, workers=None):
+    """Compute many one-sided limits, reusing ``LIMIT_CACHE``.
+
+    The limits missing from the cache are computed concurrently, each in
+    a worker process killed after ``budget`` seconds.
+
+    Parameters
+    ==========
+        requests : `list`
+            The ``(expression, symbol, point, direction)`` of each limit,
+            the direction being "+" or "-".
+        budget : `float`, `optional`
+            Seconds each limit may take. Defaults to None, no limit.
+        workers : `int`, `optional`
+            The maximum number of concurrent workers.
+            Defaults to the CPU count.
+
+    Returns
+    =======
+        list
+            The limits, None where sympy failed or ran out of time.
+    """
+    keys = [(sp.srepr(expression), str(symbol), sp.srepr(sp.sympify(point)), direction)
+            for expression, symbol, point, direction in requests]
+    results = [LIMIT_CACHE.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    with stage("limit"):
+        outcomes = map_with_budget(
+            sp.limit, [requests[i] for i in missing], budget, workers=workers)
+    for i, outcome in zip(missing, outcomes):
+        if isinstance(outcome, sp.Basic):
+            LIMIT_CACHE.put(keys[i], outcome)
+            results[i] = outcome
+    return results
+
+
+class PersistentCache:
+    """A size-bounded SQLite cache of analysis results kept across processes
+
+    Entries are keyed by the ``srepr`` of an expression and the name of
+    an operation. They are stamped with ``VERSION`` and the sympy version,
+    and entries with another stamp are dropped when the cache is opened.
+
+    Reads do not write: the entries they use are marked as recently used
+    in batches of ``TOUCH_BATCH``, by the next ``put`` or by ``close``.
+    Writes only count the entries, to evict the least recently used ones,
+    when the count kept by this process exceeds ``maxsize`` or every
+    ``COUNT_EVERY`` writes, for the entries other processes add.
+    """
+
+    # Bump when the results stored by Function change.
+    VERSION = 1
+
+    # Reads marked as recently used at once.
+    TOUCH_BATCH = 64
+
+    # Writes between two counts of the entries.
+    COUNT_EVERY = 64
+
+    def __init__(self, path, maxsize=100_000):
+        """Open, or create, a cache file.
+
+        Parameters
+        ==========
+            path : `str`
+                The SQLite database file.
+            maxsize : `int`, `optional`
+                The maximum number of entries, the least recently used
+                being evicted first. Defaults to 100000.
+        """
+        self.path = path
+        self.maxsize = maxsize
+        self.version = f"{self.VERSION}:{sp.__version__}"
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+        self.__connection = None
+        self.__pid = None
+        self.__touched = {}
+        self.__puts = 0
+        with self.__lock:
+            connection = self.__connect()
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT, operation TEXT, "
+                "version TEXT, value BLOB, used REAL, PRIMARY KEY (key, operation))")
+            connection.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+            connection.execute("DELETE FROM entries WHERE version != ?", (self.version,))
+            connection.commit()
+            self.__size = self.__count()
+
+    def get(self, key, operation, default=None):
+        """Get a cached result and mark it as recently used.
+
+        Parameters
+        ==========
+            key : `str`
+                The ``srepr`` of the expression.
+            operation : `str`
+                The name of the operation, with its arguments.
+            default : `object`, `optional`
+                The value returned on a miss. Defaults to None.
+
+        Returns
+        =======
+            object
+                The cached result, or ``default`` if it is missing.
+        """
+        with self.__lock:
+            connection = self.__connect()
+            row = connection.execute(
+                "SELECT value FROM entries WHERE key = ? AND operation = ?",
+                (key, operation)).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            self.__touched[key, operation] = time.time()
+            if len(self.__touched) >= self.TOUCH_BATCH:
+                self.__touch()
+                connection.commit()
+            self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, key, operation, value):
+        """Store a result, evicting the least recently used ones if full.
+
+        Parameters
+        ==========
+            key : `str`
+                The ``srepr`` of the expression.
+            operation : `str`
+                The name of the operation, with its arguments.
+            value : `object`
+                The picklable result.
+        """
+        blob = pickle.dumps(value)
+        with self.__lock:
+            connection = self.__connect()
+            self.__touch()
+            stored = connection.execute(
+                "SELECT 1 FROM entries WHERE key = ? AND operation = ?",
+                (key, operation)).fetchone()
+            connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, operation, self.version, blob, time.time()))
+            self.__size += stored is None
+            self.__puts += 1
+            if self.__size > self.maxsize or self.__puts % self.COUNT_EVERY == 0:
+                self.__size = self.__count()
+            if self.__size > self.maxsize:
+                connection.execute(
+                    "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries "
+                    "ORDER BY used LIMIT ?)", (self.__size - self.maxsize,))
+                self.__size = self.maxsize
+            connection.commit()
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self.__lock:
+            connection = self.__connect()
+            connection.execute("DELETE FROM entries")
+            connection.commit()
+            self.__touched.clear()
+            self.__size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        """Mark the entries read since the last write as used, and disconnect."""
+        with self.__lock:
+            if self.__pid == os.getpid():
+                self.__touch()
+                self.__connection.commit()
+                self.__connection.close()
+            self.__connection = None
+            self.__pid = None
+
+    def info(self):
+        """Get the cache statistics.
+
+        Returns
+        =======
+            dict
+                The hits, misses, current size and maximum size.
+        """
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self), "maxsize": self.maxsize}
+
+    def __len__(self):
+        """Get the number of cached entries."""
+        with self.__lock:
+            return self.__count()
+
+    def __touch(self):
+        """Mark the entries read since the last write as recently used."""
+        if self.__touched:
+            self.__connect().executemany(
+                "UPDATE entries SET used = ? WHERE key = ? AND operation = ?",
+                [(used, key, operation) for (key, operation), used in self.__touched.items()])
+            self.__touched.clear()
+
+    def __count(self):
+        """Count the entries."""
+        return self.__connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def __connect(self):
+        """Get the connection of this process, reconnecting after a fork."""
+        if self.__pid != os.getpid():
+            import sqlite3
+
+            self.__connection = sqlite3.connect(self.path, timeout=30)
+            self.__pid = os.getpid()
+        return self.__connection
+
+
+# The persistent cache consulted by Function, if any. The environment
+# variable DERIVATIVEXPERT_CACHE names a file to enable it at import.
+_PERSISTENT_CACHE = []
+
+
+def enable_persistent_cache(path, maxsize=100_000):
+    """Make Function store its analyses in a persistent cache.
+
+    Parameters
+    ==========
+        path : `str`
+            The SQLite database file.
+        maxsize : `int`, `optional`
+            The maximum number of entries. Defaults to 100000.
+
+    Returns
+    =======
+        PersistentCache
+            The cache now in use.
+    """
+    disable_persistent_cache()
+    _PERSISTENT_CACHE[:] = [PersistentCache(path, maxsize)]
+    return _PERSISTENT_CACHE[0]
+
+
+def disable_persistent_cache():
+    """Stop using the persistent cache, closing it."""
+    for cache in _PERSISTENT_CACHE:
+        cache.close()
+    _PERSISTENT_CACHE.clear()
+
+
+def persistent_cache():
+    """Get the persistent cache in use, or None if it is disabled."""
+    return _PERSISTENT_CACHE[0] if _PERSISTENT_CACHE else None
+
+
+atexit.register(disable_persistent_cache)
+
+if os.environ.get("DERIVATIVEXPERT_CACHE"):
+    enable_persistent_cache(os.environ["DERIVATIVEXPERT_CACHE"])
@@ -0,0 +1,127 @@
+"""Canonical forms of expressions, so equivalent inputs share their work
+
+``x^2+3*x``, ``3*x + x**2`` and ``x*(x+3)`` all have the canonical form
+``x**2 + 3*x``. The cheap structural normalization distributes products
+over sums with ``expand_mul``, without expanding powers. ``simplify``
+optionally runs ``sympy.simplify`` first.
+
+A form is only used if it keeps the free symbols, the denominators, the
+radicands and the applications of functions not defined on all the
+reals, such as ``log`` or ``tan``, so that it has the same domain:
+``x*(1/x + 1)`` is not replaced by ``x + 1``, nor ``(x**2 - 1)/(x - 1)``
+by ``x + 1`` when simplifying.
+"""
+
+import sympy as sp
+from advanced_calc.cache import LRUCache
+from advanced_calc.metrics import stage
+from advanced_calc.parser import parse
+
+# Canonical forms keyed by (expression, simplify).
+CANONICAL_CACHE = LRUCache(maxsize=4096)
+
+# Functions defined on all the reals, which do not restrict the domain.
+_TOTAL = (sp.sin, sp.cos, sp.exp, sp.sinh, sp.cosh, sp.atan, sp.Abs)
+
+# The shared instance of each canonical form.
+INTERNED = LRUCache(maxsize=4096)
+
+
+def canonical(expression, simplify=False):
+    """Get the canonical form of an expression.
+
+    Equivalent expressions with the same domain get the same form, and
+    equal forms are the same object, see ``intern``.
+
+    Parameters
+    ==========
+        expression : `str` or `Expr`
+            The expression to canonicalize.
+        simplify : `bool`, `optional`
+            Try ``sympy.simplify`` before the structural normalization,
+            which is slower but finds more equivalences.
+            Defaults to False.
+
+    Returns
+    =======
+        Expr
+            The canonical form.
+
+    Raises
+    ======
+        SympifyError, TypeError
+            If the expression cannot be parsed.
+    """
+    expression = parse(expression)
+    key = (expression, simplify)
+    form = CANONICAL_CACHE.get(key)
+    if form is None:
+        form = intern(_normalize(expression, simplify))
+        CANONICAL_CACHE.put(key, form)
+    return form
+
+
+def canonical_key(expression, simplify=False):
+    """Get a key identifying an expression up to equivalence.
+
+    Parameters
+    ==========
+        expression : `str` or `Expr`
+            The expression.
+        simplify : `bool`, `optional`
+            Use the simplified canonical form. Defaults to False.
+
+    Returns
+    =======
+        str
+            The ``srepr`` of the canonical form, stable across processes.
+    """
+    return sp.srepr(canonical(expression, simplify))
+
+
+def intern(expression):
+    """Get the shared instance of an expression.
+
+    Parameters
+    ==========
+        expression : `Expr`
+            The expression.
+
+    Returns
+    =======
+        Expr
+            The first live instance equal to the expression.
+    """
+    shared = INTERNED.get(expression)
+    if shared is None:
+        INTERNED.put(expression, expression)
+        shared = expression
+    return shared
+
+
+def _normalize(expression, simplify):
+    """Find the canonical form of a parsed expression."""
+    forms = [expression]
+    if simplify:
+        with stage("simplify", expression):
+            forms.insert(0, sp.simplify(expression))
+    signature = None
+    for form in forms:
+        with stage("canonicalize", form):
+            form = sp.expand_mul(form)
+        if signature is None:
+            signature = _signature(expression)
+        if _signature(form) == signature:
+            return form
+    return expression
+
+
+def _signature(expression):
+    """Get what decides the domain of an expression, normalized."""
+    powers = expression.atoms(sp.Pow)
+    denominators = {sp.expand_mul(power.base) for power in powers if power.exp.is_negative}
+    radicands = {sp.expand_mul(power.base) for power in powers if not power.exp.is_integer}
+    applications = {sp.expand_mul(application) for application in expression.atoms(sp.Function)
+                    if not isinstance(application, _TOTAL)}
+    return (expression.free_symbols, frozenset(denominators), frozenset(radicands),
+            frozenset(applications))
@@ -3,7 +3,7 @@ to calculate the derivative of a function"""
 
 import sympy as sp
 from advanced_calc.function import Function
-from plot.plot import Plotter
+from advanced_calc.metrics import stage
 
 
 class Derivative:
@@ -31,20 +31,41 @@ class Derivative:
         """
         if function:
             self.function = function
-        symb = "x"
-        if len(self.function.fvars) > 0:
-            symb = self.function.fvars[0]
-        end = order
-        while order > 0:
-            self.diff = sp.Derivative(
-                self.function.expression, symb, evaluate=True
-            )
-            if steps:
-                print(f"Derivative of order {end-order+1}: {self.diff}")
-            self.function = Function(str(self.diff))
-            order -= 1
+        if steps:
+            self.diff = self.function.expression
+            for i, derivative in enumerate(self.tower(order=order), start=1):
+                print(f"Derivative of order {i}: {derivative}")
+                self.diff = derivative
+        else:
+            with stage("diff", self.function.expression):
+                self.diff = sp.diff(self.function.expression, self.function.symbol, order)
+        self.function = Function(self.diff, symbol=self.function.symbol)
         return self.diff
 
+    def tower(self, function=None, order=1):
+        """Compute the derivatives of every order up to the given one.
+
+        Each derivative is obtained from the previous one, so the whole
+        tower costs as much as differentiating once per order.
+
+        Args:
+            function (Function, optional): Function object. Defaults to None.
+            order (int, optional): Highest order of differentiation. Defaults to 1.
+
+        Returns:
+            list: The derivatives of order 1, 2, ..., order.
+        """
+        if function:
+            self.function = function
+        symb = self.function.symbol
+        derivatives = []
+        derivative = self.function.expression
+        for _ in range(order):
+            with stage("diff", derivative):
+                derivative = sp.diff(derivative, symb)
+            derivatives.append(derivative)
+        return derivatives
+
     def evaluate(self, value):
         """Evaluate the derivative at a given value.
         
@@ -58,9 +79,13 @@ class Derivative:
 
     def plot(self):
         """Plot the derivative of the function"""
+        from plot.plot import Plotter
+
         Plotter.plot(func=self.function)
 
 if __name__ == "__main__":
+    from plot.plot import Plotter
+
     f = Function("x^5")
     Plotter.plot(func=f)
 
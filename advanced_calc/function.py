@@ -1,37 +1,88 @@
 """A utility class to handle functions"""
 
-from heapq import merge
+import pickle
+import numpy as np
 import sympy as sp
 from sympy.core.sympify import SympifyError
 from sympy.calculus.util import continuous_domain, function_range
+from advanced_calc.cache import DERIVATIVE_CACHE, cached_limits, persistent_cache
+from advanced_calc.metrics import stage
+from advanced_calc.numeric import (
+    DEFAULT_WINDOW, compile_expressions, find_roots, set_mask, sign_table, window_bounds)
+from advanced_calc.parser import parse
+from advanced_calc.timeout import (
+    TIMEOUT, call_with_timeout, map_with_budget, run_with_budget)
+from advanced_calc.value import FunctionValue
+
+
+# Marks the results missing from the persistent cache.
+_MISSING = object()
+
+# The analyses of Function.analyze: name -> (dependencies, whether it
+# runs in a worker process).
+ANALYSES = {
+    "derivatives": ((), False),
+    "domain": ((), False),
+    "singularities": (("domain",), False),
+    "range": (("domain",), True),
+    "critical_points": (("derivatives", "singularities"), True),
+    "inflection_points": (("derivatives", "singularities"), True),
+    "asymptotes": (("singularities",), True),
+    "extrema": (("domain",), True),
+    "monotonicity": (("critical_points",), False),
+    "concavity": (("inflection_points",), False),
+}
 
 
 class Function:
     """A class to handle functions"""
 
-    def __init__(self, expression):
+    analysis_timeout = 5
+
+    def __init__(self, expression, symbol=None):
         """Initialize the function with an expression.
 
         Parameters
         ==========
             expression : `str`
                 The expression of the function
-            fvars : `list`
-                The arguments of the function
+            symbol : `Symbol`, `optional`
+                The variable of the single variable analyses. Defaults to
+                None, the first argument of the function. Derivatives keep
+                the variable of the function they come from.
         """
-        from advanced_calc.derivative import Derivative
-
         self.expression = expression
         self.fvars = self.__expression.free_symbols
-        self.diff = Derivative()
-        self.range = function_range(
-            self.__expression, sp.Symbol("x")
-            if len(self.fvars) == 0
-            else self.fvars[0], sp.S.Reals)
-        self.domain = continuous_domain(
-            self.__expression, sp.Symbol("x")
-            if len(self.fvars) == 0
-            else self.fvars[0], sp.S.Reals)
+        self.__symbol = symbol
+        self.__diff = None
+
+    @property
+    def diff(self):
+        """Get the Derivative differentiating the function.
+
+        It is created on first use, ``advanced_calc.derivative`` being
+        imported only then.
+
+        Returns
+        =======
+            Derivative: The differentiator of the function
+        """
+        if self.__diff is None:
+            from advanced_calc.derivative import Derivative
+
+            self.__diff = Derivative()
+        return self.__diff
+
+    @diff.setter
+    def diff(self, diff):
+        """Set the Derivative differentiating the function.
+
+        Parameters
+        ==========
+            diff : `Derivative`
+                The differentiator of the function
+        """
+        self.__diff = diff
 
     @property
     def expression(self):
@@ -49,7 +100,7 @@ class Function:
 
         Parameters
         ==========
-            expression : `str`
+            expression : `str` or `FunctionValue`
                 The expression of the function
 
         Raises
@@ -57,9 +108,33 @@ class Function:
             ValueError
                 If the expression is invalid
         """
+        if isinstance(expression, FunctionValue):
+            expression = expression.expression
         if not self.is_valid_expression(expression):
             raise ValueError("Invalid expression")
-        self.__expression = sp.sympify(expression)
+        self.__expression = parse(expression)
+        self.__range = None
+        self.__domain = None
+        self.__derivatives = {}
+        self.__singularities = {}
+        self.__compiled = {}
+        self.__value = None
+
+    @property
+    def value(self):
+        """Get the compact value of the function.
+
+        Functions of equivalent expressions share the same value, to
+        which they attach the results of their analyses.
+
+        Returns
+        =======
+            FunctionValue
+                The immutable and interned value of the expression
+        """
+        if self.__value is None:
+            self.__value = FunctionValue(self.__expression)
+        return self.__value
 
     @property
     def fvars(self):
@@ -68,7 +143,7 @@ class Function:
         Returns
         =======
             list
-                The arguments of the function
+                The arguments of the function, sorted by name
         """
         return self.__fvars
 
@@ -87,18 +162,52 @@ class Function:
                 If the arguments are invalid
         """
         if not self.is_valid_vars(fvars):
-            raise ValueError("Invalid number of arguments")
-        self.__fvars = list(fvars)
+            raise ValueError("Invalid arguments")
+        self.__fvars = sorted(fvars, key=str)
+
+    @property
+    def symbol(self):
+        """Get the variable of the function.
+
+        Returns
+        =======
+            Symbol
+                The variable given at construction, else the first
+                argument of the function, or ``x`` for constants
+        """
+        if self.__symbol is not None:
+            return self.__symbol
+        return sp.Symbol("x") if len(self.fvars) == 0 else self.fvars[0]
+
+    def __single_variable(self, analysis):
+        """Check that the function only depends on its variable.
+
+        Raises
+        ======
+            ValueError
+                If the function has another free symbol, the analysis
+                being defined for functions of one variable only.
+        """
+        others = [var for var in self.fvars if var != self.symbol]
+        if others:
+            names = ", ".join(str(var) for var in self.fvars)
+            raise ValueError(
+                f"{analysis} needs a function of one variable, not of {names}")
 
     @property
     def range(self):
         """Get the range of the function.
 
+        The range is computed on first access and memoized. If it cannot
+        be found within ``analysis_timeout`` seconds, the reals are used.
+
         Returns
         =======
             Interval
                 The range of the function
         """
+        if self.__range is None:
+            self.__range = self.__real_set(function_range)
         return self.__range
 
     @range.setter
@@ -116,11 +225,16 @@ class Function:
     def domain(self):
         """Get the domain of the function.
 
+        The domain is computed on first access and memoized. If it cannot
+        be found within ``analysis_timeout`` seconds, the reals are used.
+
         Returns
         =======
             Interval:
                 The domain of the function
         """
+        if self.__domain is None:
+            self.__domain = self.__real_set(continuous_domain)
         return self.__domain
 
     @domain.setter
@@ -134,6 +248,76 @@ class Function:
         """
         self.__domain = domain
 
+    def __real_set(self, analysis):
+        """Run a set-valued analysis over the reals.
+
+        Parameters
+        ==========
+            analysis : `callable`
+                ``continuous_domain`` or ``function_range``
+
+        Returns
+        =======
+            Set
+                The result of the analysis, or ``S.Reals`` if it failed
+                or timed out
+        """
+        def compute():
+            try:
+                with stage(analysis.__name__, self.__expression):
+                    return call_with_timeout(
+                        analysis, self.analysis_timeout, None,
+                        self.__expression, self.symbol, sp.S.Reals)
+            except (NotImplementedError, ValueError, TypeError):
+                return None
+
+        result = self.__persisted(analysis.__name__, compute)
+        return sp.S.Reals if result is None else result
+
+    def __persisted(self, operation, compute, shared=True):
+        """Get the result of an operation from the caches.
+
+        Shared operations, whose result does not depend on the form of
+        the expression, are attached to ``self.value`` and keyed by its
+        canonical form in the persistent cache, so that equivalent
+        expressions compute them once. The others are keyed by the
+        expression itself. Without a persistent cache, see
+        ``enable_persistent_cache``, results that are not attached are
+        always computed. Results that are None or ``TIMEOUT`` are not
+        stored, and ``_Approximate`` ones, which depend on the time
+        budget, are only attached.
+
+        Parameters
+        ==========
+            operation : `str`
+                The name of the operation, with its arguments.
+            compute : `callable`
+                Computes the result on a miss.
+            shared : `bool`, `optional`
+                Share the result between equivalent expressions.
+                Defaults to True.
+
+        Returns
+        =======
+            object
+                The cached or computed result.
+        """
+        def stored():
+            store = persistent_cache()
+            if store is not None:
+                key = self.value.key if shared else sp.srepr(self.__expression)
+                result = store.get(key, operation, _MISSING)
+                if result is not _MISSING:
+                    return result
+            result = compute()
+            if isinstance(result, _Approximate):
+                return result.value
+            if store is not None and result is not None and result is not TIMEOUT:
+                store.put(key, operation, result)
+            return result
+
+        return self.value.attached(operation, stored) if shared else stored()
+
     def evaluate(self, value):
         """Evaluate the function at a given value.
 
@@ -152,19 +336,109 @@ class Function:
             ValueError
                 If the value is invalid
         """
+        self.__single_variable("evaluate")
         try:
-            value = float(sp.simplify(value).evalf())
+            value = float(parse(value).evalf())
         except (ValueError, TypeError) as exc:
             raise ValueError("Invalid value") from exc
-        if value not in self.domain:
+        if not set_mask(self.domain, [value])[0]:
             raise ValueError("Value is not in the domain of the function")
 
+        with stage("simplify", self.__expression):
+            simplified = sp.simplify(self.__expression)
         if len(self.fvars) == 0:
-            return round(float(sp.simplify(self.__expression).evalf()), 3)
+            return round(float(simplified.evalf()), 3)
+
+        return round(float(simplified.subs({self.symbol: value}).evalf()), 3)
+
+    def evaluate_many(self, values):
+        """Evaluate the function at many values at once.
+
+        The expression is compiled to a NumPy function on the first call
+        and reused afterwards. Results are not rounded.
+
+        Parameters
+        ==========
+            values : `array_like`
+                The values to evaluate the function at. For functions of
+                several variables, the points, whose last axis holds one
+                coordinate per variable of ``fvars``.
+
+        Returns
+        =======
+            ndarray
+                The values of the function, NaN outside the domain
+                of the function or where the result is not real
+        """
+        return self.compile()(values)[..., 0]
+
+    def compile(self, order=0):
+        """Compile the function and its derivatives to one NumPy function.
+
+        Common subexpressions of the function and its derivative tower
+        are computed once per call. The compiled function is cached on
+        the instance for each order.
+
+        Parameters
+        ==========
+            order : `int`, `optional`
+                Also compile the derivatives up to this order.
+                Defaults to 0.
 
-        return round(
-            float(sp.simplify(self.__expression).subs({self.__fvars[0]: value}).evalf()), 3
-        )
+        Returns
+        =======
+            callable
+                A function of the values, or points for several variables,
+                returning an ndarray whose last axis holds the function and
+                its derivatives of order 1, 2, ..., order. Values are NaN
+                outside the domain or where they are not real.
+        """
+        key = ("tower", order)
+        if key not in self.__compiled:
+            expressions = [self.__expression]
+            expressions += [d.expression for d in self.derivative_tower(order=order)]
+            with stage("lambdify", self.__expression):
+                self.__compiled[key] = compile_expressions(expressions, self.__arguments())
+        evaluator = self.__compiled[key]
+        return lambda values: self.__evaluate_compiled(evaluator, values)
+
+    def __arguments(self):
+        """Get the symbols of the compiled functions, in order."""
+        return self.fvars if len(self.fvars) > 1 else [self.symbol]
+
+    def __evaluate_compiled(self, evaluator, points):
+        """Evaluate jointly compiled expressions of ``__arguments``.
+
+        Parameters
+        ==========
+            evaluator : `callable`
+                The function made by ``compile_expressions``.
+            points : `array_like`
+                The values, or points for several variables.
+
+        Returns
+        =======
+            ndarray
+                The values stacked along a new last axis, NaN outside the
+                domain of functions of one variable.
+
+        Raises
+        ======
+            ValueError
+                If the points do not have one coordinate per variable.
+        """
+        points = np.asarray(points, dtype=float)
+        if len(self.fvars) <= 1:
+            columns = [points]
+            mask = set_mask(self.domain, points)
+        elif points.ndim == 0 or points.shape[-1] != len(self.fvars):
+            raise ValueError(f"Points must have {len(self.fvars)} coordinates")
+        else:
+            columns = [points[..., i] for i in range(len(self.fvars))]
+            mask = np.ones(points.shape[:-1], dtype=bool)
+        result = np.moveaxis(evaluator(*columns), 0, -1)
+        result[~mask] = np.nan
+        return result
 
     @staticmethod
     def is_valid_expression(expression):
@@ -180,7 +454,7 @@ class Function:
                 True if the expression is valid, False otherwise
         """
         try:
-            sp.sympify(expression)
+            parse(expression)
         except (SympifyError, TypeError):
             return False
         return True
@@ -199,11 +473,14 @@ class Function:
             bool
                 True if the arguments are valid, False otherwise
         """
-        return len(fvars) <= 1
+        return all(isinstance(var, sp.Symbol) for var in fvars)
 
     def diffrentiate(self, order=1, steps=False):
         """Differentiate the function.
 
+        Derivatives are cached on the function and in the process-wide
+        ``DERIVATIVE_CACHE``, so repeated calls do not differentiate again.
+
         Parameters
         ==========
             order : `int`, `optional`
@@ -216,9 +493,167 @@ class Function:
             Function
                 The derivative of the function.
         """
-        return Function(
-            str(self.diff.diffrentiate(function=self, order=order, steps=steps))
-        )
+        if steps:
+            derivative = Function(
+                self.diff.diffrentiate(function=self, order=order, steps=steps),
+                symbol=self.symbol)
+            self.__store_derivative(order, derivative)
+            return derivative
+        if order not in self.__derivatives:
+            derivative = DERIVATIVE_CACHE.get(self.__derivative_key(order))
+            if derivative is None:
+                derivative = Function(self.__persisted(
+                    f"diffrentiate({self.symbol}, {order})",
+                    lambda: self.diff.diffrentiate(function=self, order=order),
+                    shared=False), symbol=self.symbol)
+            self.__store_derivative(order, derivative)
+        return self.__derivatives[order]
+
+    def derivative_tower(self, order=1):
+        """Differentiate the function up to a given order.
+
+        Parameters
+        ==========
+            order : `int`, `optional`
+                Highest order of differentiation. Defaults to 1.
+
+        Returns
+        =======
+            list
+                The derivatives of order 1, 2, ..., order as Function objects.
+        """
+        orders = range(1, order + 1)
+        if any(n not in self.__derivatives
+               and self.__derivative_key(n) not in DERIVATIVE_CACHE for n in orders):
+            for n, derivative in zip(orders, self.diff.tower(function=self, order=order)):
+                if n not in self.__derivatives:
+                    self.__store_derivative(n, Function(derivative, symbol=self.symbol))
+        return [self.diffrentiate(order=n) for n in orders]
+
+    def __derivative_key(self, order):
+        """Get the key of a derivative in ``DERIVATIVE_CACHE``."""
+        return (sp.srepr(self.__expression), str(self.symbol), order)
+
+    def __store_derivative(self, order, derivative):
+        """Cache a derivative on the function and process-wide."""
+        self.__derivatives[order] = derivative
+        DERIVATIVE_CACHE.put(self.__derivative_key(order), derivative)
+
+    def partial_derivative(self, variable, order=1):
+        """Differentiate the function with respect to one of its variables.
+
+        Partial derivatives share ``DERIVATIVE_CACHE`` with
+        ``diffrentiate``.
+
+        Parameters
+        ==========
+            variable : `Symbol` or `str`
+                The variable of differentiation.
+            order : `int`, `optional`
+                Order of differentiation. Defaults to 1.
+
+        Returns
+        =======
+            Function
+                The partial derivative of the function.
+        """
+        variable = sp.Symbol(str(variable))
+        if variable == self.symbol:
+            return self.diffrentiate(order=order)
+        key = (sp.srepr(self.__expression), str(variable), order)
+        derivative = DERIVATIVE_CACHE.get(key)
+        if derivative is None:
+            derivative = Function(sp.diff(self.__expression, variable, order))
+            DERIVATIVE_CACHE.put(key, derivative)
+        return derivative
+
+    def gradient(self):
+        """Get the gradient of the function.
+
+        Returns
+        =======
+            Matrix
+                The column of partial derivatives, in the order of ``fvars``.
+        """
+        return sp.Matrix([self.partial_derivative(var).expression for var in self.fvars])
+
+    def hessian(self):
+        """Get the Hessian matrix of the function.
+
+        Each entry is differentiated from the gradient, and the entries
+        below the diagonal are copied from the symmetric ones.
+
+        Returns
+        =======
+            Matrix
+                The second partial derivatives, in the order of ``fvars``.
+        """
+        gradient = [self.partial_derivative(var) for var in self.fvars]
+        size = len(self.fvars)
+        hessian = sp.zeros(size, size)
+        for i in range(size):
+            for j in range(i, size):
+                hessian[i, j] = gradient[i].partial_derivative(self.fvars[j]).expression
+                hessian[j, i] = hessian[i, j]
+        return hessian
+
+    def evaluate_gradient(self, points):
+        """Evaluate the gradient at many points at once.
+
+        The gradient is differentiated and compiled to NumPy, with its
+        common subexpressions shared, on the first call.
+
+        Parameters
+        ==========
+            points : `array_like`
+                The points, whose last axis holds one coordinate per
+                variable of ``fvars``, or values for one variable.
+
+        Returns
+        =======
+            ndarray
+                The gradients, with a last axis of one partial derivative
+                per variable.
+
+        Raises
+        ======
+            ValueError
+                If the points do not have one coordinate per variable.
+        """
+        if "gradient" not in self.__compiled:
+            self.__compiled["gradient"] = compile_expressions(
+                list(self.gradient()), self.__arguments())
+        return self.__evaluate_compiled(self.__compiled["gradient"], points)
+
+    def evaluate_hessian(self, points):
+        """Evaluate the Hessian matrix at many points at once.
+
+        The Hessian is differentiated and compiled to NumPy, with its
+        common subexpressions shared, on the first call.
+
+        Parameters
+        ==========
+            points : `array_like`
+                The points, whose last axis holds one coordinate per
+                variable of ``fvars``, or values for one variable.
+
+        Returns
+        =======
+            ndarray
+                The Hessian matrices, with two last axes of one second
+                partial derivative per pair of variables.
+
+        Raises
+        ======
+            ValueError
+                If the points do not have one coordinate per variable.
+        """
+        if "hessian" not in self.__compiled:
+            self.__compiled["hessian"] = compile_expressions(
+                list(self.hessian()), self.__arguments())
+        size = len(self.fvars)
+        result = self.__evaluate_compiled(self.__compiled["hessian"], points)
+        return result.reshape(result.shape[:-1] + (size, size))
 
     def slope(self, value):
         """Calculate the slope of the function at a given value.
@@ -233,168 +668,884 @@ class Function:
             float
                 The slope of the function at the given value.
         """
+        self.__single_variable("slope")
         return self.diffrentiate().evaluate(value)
 
-    def critical_points(self, interval=None):
+    def critical_points(self, interval=None, tolerance=1e-9, budget=None):
         """Calculate the critical points of the function.
 
+        The points are first solved for symbolically, within
+        ``analysis_timeout`` seconds. If that fails or finds infinitely
+        many points, the roots of the derivative are searched numerically
+        over the interval, clipped to ``DEFAULT_WINDOW``.
+
         Parameters
         ==========
             interval : `list`, `optional`
                 The interval to calculate the critical points.
                 Defaults to None.
+            tolerance : `float`, `optional`
+                Numeric critical points closer than this are merged.
+                Defaults to 1e-9.
+            budget : `float`, `optional`
+                Seconds the analysis may run in a worker process.
+                Defaults to None, running it in this process.
 
         Returns
         =======
             list
-                The critical points of the function.
+                The sorted critical points of the function, exact when
+                solved symbolically and floats otherwise, or ``TIMEOUT``.
         """
+        self.__single_variable("critical_points")
+        if budget is not None:
+            return self.__budgeted(
+                "critical_points", budget, interval=interval, tolerance=tolerance)
         if len(self.fvars) < 1:
             return []
-        if not interval:
-            interval = self.domain
-        critical_points = []
-        critical_points += sp.singularities(
-            self.expression,
-            self.fvars[0],
-            domain=interval
-            )
-        critical_points += sp.solveset(
-            self.diffrentiate().expression,
-            self.fvars[0],
-            domain=interval
-            )
+        interval = self.__as_set(interval)
+        return self.__persisted(
+            f"critical_points({sp.srepr(interval)}, {tolerance!r})",
+            lambda: self.__critical_points(interval, tolerance))
+
+    def __critical_points(self, interval, tolerance):
+        """Solve for the critical points, numerically if sympy fails.
+
+        Returns
+        =======
+            list
+                The sorted critical points, ``_Approximate`` if sympy
+                timed out.
+        """
+        derivative = self.diffrentiate().expression
+        try:
+            with stage("solveset", derivative):
+                critical_points = call_with_timeout(
+                    _solve_critical_points, self.analysis_timeout, TIMEOUT,
+                    self.expression, derivative, self.symbol, interval)
+        except (NotImplementedError, ValueError, TypeError):
+            critical_points = None
+        if critical_points is None or critical_points is TIMEOUT:
+            with stage("find_roots", derivative):
+                numeric = self.__numeric_critical_points(interval, tolerance)
+            if critical_points is TIMEOUT:
+                return _Approximate(numeric)
+            critical_points = numeric
         return critical_points
 
-    def extrema(self, interval=None):
+    def __as_set(self, interval):
+        """Convert an interval argument to a sympy set.
+
+        Parameters
+        ==========
+            interval : `list` or `Set`
+                A ``[start, end]`` list, a set, or None for the domain.
+
+        Returns
+        =======
+            Set
+                The interval as a set.
+        """
+        if not interval:
+            return self.domain
+        if isinstance(interval, (list, tuple)):
+            return sp.Interval(*interval)
+        return interval
+
+    def __budgeted(self, name, budget, **kwargs):
+        """Run an analysis method in a worker process killed after a budget.
+
+        The worker is forked from this process, so it starts from the
+        derivatives and results already computed here, and sends back
+        those it computed, see ``__absorb``. The result is attached to
+        ``self.value``, so that a repeated call does not fork again.
+
+        Parameters
+        ==========
+            name : `str`
+                The name of the analysis method.
+            budget : `float`
+                Seconds the worker may run.
+
+        Returns
+        =======
+            object
+                The result of the analysis, or ``TIMEOUT``.
+        """
+        def compute():
+            outcome = run_with_budget(
+                self.__exporting, budget, getattr(self, name), **kwargs)
+            if outcome is TIMEOUT:
+                return outcome
+            result, state = outcome
+            self.__absorb(state)
+            return result
+
+        return self.value.attached(("budgeted", name, repr(sorted(kwargs.items()))), compute)
+
+    def __exporting(self, method, *args, **kwargs):
+        """Call a method, in a worker process, also returning the state it left.
+
+        Returns
+        =======
+            tuple
+                The result of the method and the state of the function,
+                see ``__absorb``.
+        """
+        result = method(*args, **kwargs)
+        derivatives = {order: (derivative.expression, _picklable(derivative.value.attachments()))
+                       for order, derivative in self.__derivatives.items()}
+        return result, {
+            "derivatives": derivatives,
+            "domain": self.__domain,
+            "range": self.__range,
+            "singularities": dict(self.__singularities),
+            "analyses": _picklable(self.value.attachments()),
+        }
+
+    def __absorb(self, state):
+        """Merge the state a worker process left, keeping what is known here.
+
+        Parameters
+        ==========
+            state : `dict`
+                The derivatives, with the results attached to their values,
+                the domain, the range, the singularities and the results
+                attached to the value, as returned by ``__exporting``.
+        """
+        for order, (expression, analyses) in state["derivatives"].items():
+            if order not in self.__derivatives:
+                self.__store_derivative(order, Function(expression, symbol=self.symbol))
+            self.__derivatives[order].value.attach(analyses)
+        if self.__domain is None:
+            self.__domain = state["domain"]
+        if self.__range is None:
+            self.__range = state["range"]
+        for interval, poles in state["singularities"].items():
+            self.__singularities.setdefault(interval, poles)
+        self.value.attach(state["analyses"])
+
+    def __numeric_critical_points(self, interval, tolerance):
+        """Find the critical points as the numeric roots of the derivative.
+
+        Returns
+        =======
+            list
+                The sorted critical points, as floats.
+        """
+        start, end = window_bounds(interval)
+        if start >= end:
+            return []
+        roots = find_roots(
+            self.diffrentiate().evaluate_many, start, end,
+            derivative=self.diffrentiate(order=2).evaluate_many,
+            tolerance=tolerance)
+        return [root for root, inside in zip(roots, set_mask(interval, roots)) if inside]
+
+    def extrema(self, interval=None, budget=None):
         """Calculate the extrema of the function.
 
+        When sympy cannot find them within ``analysis_timeout`` seconds,
+        or the budget runs out, the extrema are approximated numerically
+        over the interval clipped to ``DEFAULT_WINDOW``, the function
+        being probed beyond it for growth without bound.
+
         Parameters
         ==========
             interval : `list`, `optional`
                 The interval to calculate the extrema.
                 Defaults to None.
+            budget : `float`, `optional`
+                Seconds the analysis may run in a worker process.
+                Defaults to None, running it in this process.
 
         Returns
         =======
             tuple
-                The minimum and maximum values of the function.
+                The maximum and minimum values of the function, ``oo``
+                and ``-oo`` if it is unbounded, or ``TIMEOUT`` if not
+                even an approximation exists.
         """
-        if not interval:
-            interval = self.domain
-        symb = sp.Symbol("x") if len(self.fvars) == 0 else self.fvars[0]
-        mx = sp.maximum(self.expression, symb, interval)
-        mn = sp.minimum(self.expression, symb, interval)
-        return mx, mn
+        self.__single_variable("extrema")
+        if budget is not None:
+            extrema = self.__budgeted("extrema", budget, interval=interval)
+        else:
+            domain = self.__as_set(interval)
+            extrema = self.__persisted(
+                f"extrema({sp.srepr(domain)})", lambda: self.__symbolic_extrema(domain))
+        if extrema is TIMEOUT:
+            return self.__numeric_extrema(self.__as_set(interval))
+        return extrema
+
+    def __symbolic_extrema(self, domain):
+        """Find the extrema with sympy.
+
+        Returns
+        =======
+            tuple
+                The maximum and minimum, or ``TIMEOUT`` if sympy failed.
+        """
+        try:
+            with stage("maximum_minimum", self.expression):
+                return call_with_timeout(
+                    _symbolic_extrema, self.analysis_timeout, TIMEOUT,
+                    self.expression, self.symbol, domain)
+        except NotImplementedError:
+            return TIMEOUT
+
+    def __numeric_extrema(self, interval, points=10001):
+        """Approximate the extrema by sampling the function.
+
+        The samples only cover the interval clipped to ``DEFAULT_WINDOW``,
+        so the function is also probed closer and closer to its poles in
+        the window and to the open ends of the interval, and further and
+        further along the tails the window cuts off. Extrema that keep
+        growing there are reported as infinite.
+
+        Returns
+        =======
+            tuple
+                The largest and smallest sampled values, ``oo`` and ``-oo``
+                where the function is unbounded, or ``TIMEOUT`` if it is
+                nowhere defined on the samples.
+        """
+        start, end = window_bounds(interval)
+        grid = np.linspace(start, end, points)
+        values = self.evaluate_many(grid)[set_mask(interval, grid)]
+        if np.isnan(values).all():
+            return TIMEOUT
+        maximum, minimum = float(np.nanmax(values)), float(np.nanmin(values))
+        for probe in self.__probes(interval, start, end, points // 10):
+            levels = [self.evaluate_many(level)[set_mask(interval, level)] for level in probe]
+            levels = [level for level in levels if not np.isnan(level).all()]
+            if len(levels) < len(probe):
+                continue
+            if _diverges([np.nanmax(level) for level in levels]):
+                maximum = sp.oo
+            if _diverges([-np.nanmin(level) for level in levels]):
+                minimum = -sp.oo
+        return (sp.oo if maximum == np.inf else maximum,
+                -sp.oo if minimum == -np.inf else minimum)
+
+    def __probes(self, interval, start, end, points):
+        """Get the points approaching where the function may be unbounded.
+
+        Parameters
+        ==========
+            interval : `Set`
+                The interval of the extrema.
+            start : `float`
+                The start of the sampled window.
+            end : `float`
+                The end of the sampled window.
+            points : `int`
+                The number of samples of each level of a tail.
+
+        Returns
+        =======
+            list
+                The probes, each a list of three arrays of points, the
+                levels, getting closer to a pole or an open end of the
+                interval, or further along a tail cut off at an end of
+                ``DEFAULT_WINDOW``.
+        """
+        edges = [edge for edge, inside in zip((start, end), set_mask(interval, [start, end]))
+                 if not inside]
+        poles = self.__window_poles(start, end)
+        if poles is None or poles is TIMEOUT:
+            poles = []
+        offsets = [10.0 ** -exponent for exponent in (4, 7, 10)]
+        probes = [[np.array([edge + side * offset])
+                   for offset in offsets] for edge in edges + poles for side in (-1, 1)]
+        scale = max(abs(bound) for bound in DEFAULT_WINDOW)
+        for bound, side in ((start, -1), (end, 1)):
+            if bound == side * scale:
+                probes.append([side * np.linspace(10 ** k * scale, 10 ** (k + 1) * scale, points)
+                               for k in range(3)])
+        return probes
 
-    def intervals_of_increase_decreasing(self, interval=None):
+    def intervals_of_increase_decreasing(self, interval=None, budget=None):
         """Calculate the intervals of increase of the function.
 
+        The interval is split at the critical points, and the sign of the
+        derivative is evaluated once in each piece. Infinite pieces are
+        clipped at the edges of ``DEFAULT_WINDOW`` unless the sign is
+        provably constant beyond them.
+
+        Parameters
+        ==========
+            interval : `list`, `optional`
+                The interval to study. Defaults to None.
+            budget : `float`, `optional`
+                Seconds the analysis may run in a worker process.
+                Defaults to None, running it in this process.
+
         Returns
         =======
             dict
-                The intervals of increase and decrease of the function.
+                The ``[start, end]`` intervals where the function is
+                constant, increasing and decreasing, and the
+                ``Unknown`` ones clipped off, if any, or ``TIMEOUT``.
         """
-        symb = sp.Symbol("x") if len(self.fvars) == 0 else self.fvars[0]
-        critical_points = self.critical_points(interval=interval)
-        interval_points = []
-        if not interval:
-            interval = self.domain
-        if isinstance(interval, sp.Union):
-            for interval in interval.args:
-                interval_points.append(interval.start)
-                interval_points.append(interval.end)
-        else:
-            interval_points = [interval.start, interval.end]
-        interval_points = sorted(list(set(merge(critical_points, interval_points))))
-
-        signs = {"Constant":[],"Increasing" : [], "Decreasing":[]}
-        for i in range(1, len(interval_points)):
-            if sp.is_strictly_increasing(self.expression, interval=sp.Interval(
-                interval_points[i - 1]+1, interval_points[i]-1), symbol=symb):
-                signs["Increasing"] += [interval_points[i - 1], interval_points[i]]
-            elif sp.is_strictly_decreasing(self.expression, interval=sp.Interval(
-                interval_points[i - 1]+1, interval_points[i]-1), symbol=symb):
-                signs["Decreasing"] += [interval_points[i - 1], interval_points[i]]
-            else:
-                signs["Constant"] += [[interval_points[i - 1], interval_points[i]]]
+        self.__single_variable("intervals_of_increase_decreasing")
+        if budget is not None:
+            return self.__budgeted(
+                "intervals_of_increase_decreasing", budget, interval=interval)
+        return self.__monotonicity(interval, self.critical_points(interval=interval))
 
+    def __monotonicity(self, interval, critical_points):
+        """Classify the pieces between known critical points by the sign of f'."""
+        return self.__sign_intervals(
+            self.diffrentiate(), critical_points, interval,
+            {0: "Constant", 1: "Increasing", -1: "Decreasing"})
+
+    def __sign_intervals(self, derivative, points, interval, labels):
+        """Classify the pieces of an interval by the sign of a derivative.
+
+        Parameters
+        ==========
+            derivative : `Function`
+                The derivative whose sign is studied.
+            points : `list`
+                The points where the sign may change.
+            interval : `list`
+                The interval to study, None for the domain.
+            labels : `dict`
+                The name of each sign, -1, 0 and 1.
+
+        Returns
+        =======
+            dict
+                The ``[start, end]`` pieces with each label, adjacent
+                pieces with the same label being merged. The pieces
+                whose sign is not known, beyond ``DEFAULT_WINDOW``, see
+                ``__clip_tails``, or where the derivative cannot be
+                evaluated, are under ``Unknown``, if any.
+        """
+        pieces, tails = [], []
+        for i, (start, end) in enumerate(self.__components(self.__as_set(interval))):
+            bounds = [start] + [p for p in points if start < p < end] + [end]
+            bounds, clipped = self.__clip_tails(derivative, bounds)
+            tails += [(i, tail) for tail in clipped]
+            pieces += [(i, [a, b]) for a, b in zip(bounds[:-1], bounds[1:]) if a != b]
+        table = sign_table(derivative.evaluate_many, [piece for _, piece in pieces])
+        labelled = [(component, piece, "Unknown" if np.isnan(sign) else labels[sign])
+                    for (component, piece), sign in zip(pieces, table)]
+        labelled += [(component, tail, "Unknown") for component, tail in tails]
+        labelled.sort(key=lambda entry: (entry[0], float(entry[1][0])))
+        signs = {label: [] for label in labels.values()}
+        previous = None
+        for component, piece, label in labelled:
+            if previous and previous[:2] == (component, label):
+                previous[2][1] = piece[1]
+            else:
+                signs.setdefault(label, []).append(piece)
+                previous = (component, label, piece)
         return signs
 
-    def inflection_points(self, interval=None):
+    def __clip_tails(self, derivative, bounds):
+        """Split the infinite pieces of a component where a derivative may change sign.
+
+        The points known to split the component, such as numeric critical
+        points, may only cover ``DEFAULT_WINDOW``. The sign of the
+        derivative is only known on an infinite piece when sympy finds
+        finitely many zeros and singularities there, which then split it.
+        Otherwise the piece is clipped at the edge of the window.
+
+        Parameters
+        ==========
+            derivative : `Function`
+                The derivative whose sign is studied.
+            bounds : `list`
+                The sorted bounds of the pieces of the component.
+
+        Returns
+        =======
+            tuple
+                The new bounds, and the ``[start, end]`` tails clipped off.
+        """
+        low, high = (sp.Integer(edge) for edge in DEFAULT_WINDOW)
+        if bounds == [-sp.oo, sp.oo]:
+            splits = self.__sign_changes(derivative, -sp.oo, sp.oo)
+            if splits is None:
+                return [low, high], [[-sp.oo, low], [high, sp.oo]]
+            return [-sp.oo] + splits + [sp.oo], []
+        tails = []
+        if bounds[0] == -sp.oo:
+            splits = self.__sign_changes(derivative, -sp.oo, bounds[1])
+            if splits is None:
+                edge = min(low, bounds[1])
+                bounds = [edge] + bounds[1:]
+                tails.append([-sp.oo, edge])
+            else:
+                bounds = [-sp.oo] + splits + bounds[1:]
+        if bounds[-1] == sp.oo:
+            splits = self.__sign_changes(derivative, bounds[-2], sp.oo)
+            if splits is None:
+                edge = max(high, bounds[-2])
+                bounds = bounds[:-1] + [edge]
+                tails.append([edge, sp.oo])
+            else:
+                bounds = bounds[:-1] + splits + [sp.oo]
+        return bounds, tails
+
+    def __sign_changes(self, derivative, start, end):
+        """Find where a derivative may change sign on an open interval.
+
+        They are solved over the reals, then kept inside the interval, as
+        sympy loses periodic solutions when intersecting them with a
+        half-line, finding none for ``sin(x) + cos(x)`` below -98.
+
+        Returns
+        =======
+            list
+                The sorted zeros and singularities of the derivative in
+                the interval, or None unless the real ones are a finite set.
+        """
+        if derivative.expression.is_zero:
+            return []
+        try:
+            with stage("solveset", derivative.expression):
+                points = call_with_timeout(
+                    _zeros_and_poles, self.analysis_timeout, None,
+                    derivative.expression, self.symbol)
+        except (NotImplementedError, ValueError, TypeError):
+            return None
+        if points is sp.S.EmptySet:
+            return []
+        if not isinstance(points, sp.FiniteSet) or not all(p.is_real for p in points):
+            return None
+        return sorted((p for p in points if start < p < end), key=float)
+
+    def __components(self, interval):
+        """Split a set into the bounds of its connected components.
+
+        Sets that are neither intervals nor unions of intervals, such as
+        the domain of ``tan``, are split at the singularities of the
+        function inside ``DEFAULT_WINDOW``.
+
+        Parameters
+        ==========
+            interval : `Set`
+                The set to split.
+
+        Returns
+        =======
+            list
+                The ``(start, end)`` bounds of each component.
+        """
+        if isinstance(interval, sp.Union):
+            return [(part.inf, part.sup) for part in interval.args]
+        if isinstance(interval, (sp.Interval, sp.FiniteSet)):
+            return [(interval.inf, interval.sup)]
+        try:
+            start, end = interval.inf, interval.sup
+        except NotImplementedError:
+            start, end = -sp.oo, sp.oo
+        poles = self.__window_poles(start, end)
+        if poles is None or poles is TIMEOUT:
+            return [(start, end)]
+        bounds = [start] + poles + [end]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def __window_poles(self, start, end):
+        """Find the singularities of the function between bounds, inside ``DEFAULT_WINDOW``.
+
+        Returns
+        =======
+            list
+                The sorted singularities, None if they are not known to
+                be a finite set of real numbers, or ``TIMEOUT``.
+        """
+        window = sp.Intersection(sp.Interval(start, end), sp.Interval(*DEFAULT_WINDOW))
+        return self.__poles(window)
+
+    def __poles(self, interval):
+        """Find the singularities of the function inside a set.
+
+        Parameters
+        ==========
+            interval : `Set`
+                The set to search.
+
+        Returns
+        =======
+            list
+                The sorted singularities, None if they are not known to
+                be a finite set of real numbers, or ``TIMEOUT``. Memoized
+                per set, unless timed out.
+        """
+        if interval in self.__singularities:
+            return self.__singularities[interval]
+        try:
+            with stage("singularities", self.expression):
+                poles = call_with_timeout(
+                    sp.singularities, self.analysis_timeout, TIMEOUT,
+                    self.expression, self.symbol, interval)
+        except (NotImplementedError, ValueError, TypeError):
+            poles = None
+        if poles is TIMEOUT:
+            return poles
+        if poles is sp.S.EmptySet:
+            poles = []
+        elif not isinstance(poles, sp.FiniteSet) or not all(p.is_real for p in poles):
+            poles = None
+        else:
+            poles = sorted(poles, key=float)
+        self.__singularities[interval] = poles
+        return poles
+
+    def inflection_points(self, interval=None, budget=None):
         """Calculate the inflection points of the function.
 
         Parameters:
             interval : `list`, `optional`
                 The interval to calculate the inflection points.
                 Defaults to None.
+            budget : `float`, `optional`
+                Seconds the analysis may run in a worker process.
+                Defaults to None, running it in this process.
 
         Returns
         =======
             list
-                The inflection points of the function.
+                The inflection points of the function, or ``TIMEOUT``.
         """
+        self.__single_variable("inflection_points")
+        if budget is not None:
+            return self.__budgeted("inflection_points", budget, interval=interval)
         if not interval:
             interval = self.domain
         return self.diffrentiate().critical_points(interval=interval)
 
-    def concavity(self, interval=None):
+    def concavity(self, interval=None, budget=None):
         """Calculate the concavity of the function.
 
+        The interval is split at the inflection points, and the sign of
+        the second derivative is evaluated once in each piece.
+
         Parameters
         ==========
             interval : `list`, `optional`
                 The interval to calculate the concavity.
                 Defaults to None.
+            budget : `float`, `optional`
+                Seconds the analysis may run in a worker process.
+                Defaults to None, running it in this process.
 
         Returns
         =======
             dict
-                The concavity of the function.
+                The ``[start, end]`` intervals where the function is
+                linear, concave up and concave down, and the ``Unknown``
+                ones beyond ``DEFAULT_WINDOW``, if any, or ``TIMEOUT``.
         """
+        self.__single_variable("concavity")
+        if budget is not None:
+            return self.__budgeted("concavity", budget, interval=interval)
         if len(self.fvars) == 0:
             return "Constant function"
-        if not interval:
-            interval = self.domain
-        intervals = self.diffrentiate().intervals_of_increase_decreasing(interval=interval)
-        concavity = {"Linear": [], "Concave Up": [], "Concave Down": []}
-        for key, value in intervals.items():
-            if key == "Increasing":
-                concavity["Concave Up"] += [value]
-            elif key == "Decreasing":
-                concavity["Concave Down"] += [value]
-            else:
-                concavity["Linear"] += [value]
-        return concavity
+        return self.__concavity(interval, self.inflection_points(interval=interval))
 
-    def asymptotes(self):
-        """Calculate the asymptotes of the function."""
-        asymptotes = {}
+    def __concavity(self, interval, inflection_points):
+        """Classify the pieces between known inflection points by the sign of f''."""
+        if len(self.fvars) == 0:
+            return "Constant function"
+        return self.__sign_intervals(
+            self.diffrentiate(order=2), inflection_points, interval,
+            {0: "Linear", 1: "Concave Up", -1: "Concave Down"})
+
+    def asymptotes(self, budget=None):
+        """Calculate the asymptotes of the function.
+
+        The one-sided limits at each singularity and the limits at
+        infinity are computed concurrently in worker processes, and kept
+        in ``LIMIT_CACHE``. Functions with infinitely many singularities,
+        like ``tan``, are searched inside ``DEFAULT_WINDOW``.
+
+        Parameters
+        ==========
+            budget : `float`, `optional`
+                Seconds the analysis may run in a worker process.
+                Defaults to None, running it in this process.
+
+        Returns
+        =======
+            dict
+                The vertical, horizontal and oblique asymptotes of the
+                function, or ``TIMEOUT`` if a singularity or a limit is
+                not known in time.
+        """
+        self.__single_variable("asymptotes")
+        if budget is not None:
+            return self.__budgeted("asymptotes", budget)
         if len(self.fvars) == 0:
             return "No asymptotes"
-        undefined_points = sp.singularities(self.expression, self.fvars[0])
-        if undefined_points is not sp.EmptySet:
-            for point in undefined_points:
-                asymptotes["vertical_asymptotes"] = (
-                    f"{self.fvars[0]} -> {point}",
-                    f"f({self.fvars[0]}) -> {sp.limit(self.expression, self.fvars[0], point)}",
-                )
-        asymptotes["horizontal_asymptote"] = [(
-                    f"{self.fvars[0]} -> {sp.oo}",
-                    f"f({self.fvars[0]}) -> {sp.limit(self.expression, self.fvars[0], sp.oo)}",
-                )]
-        asymptotes["horizontal_asymptote"].append((
-                    f"{self.fvars[0]} -> {-sp.oo}",
-                    f"f({self.fvars[0]}) -> {sp.limit(self.expression, self.fvars[0], -sp.oo)}",
-                ))
+        return self.__persisted("asymptotes", self.__asymptotes)
+
+    def __asymptotes(self):
+        """Find the asymptotes of a function of at least one variable.
+
+        Returns
+        =======
+            dict
+                The vertical, horizontal and oblique asymptotes, or
+                ``TIMEOUT`` if the singularities or a limit are not known.
+        """
+        symb = self.symbol
+        poles = self.__poles(sp.S.Reals)
+        if poles is None:
+            poles = self.__poles(sp.Interval(*DEFAULT_WINDOW))
+        if poles is None or poles is TIMEOUT:
+            return TIMEOUT
+        # Only the sides of the poles where the function is defined and
+        # real, and the infinite ends of the domain.
+        centers = np.array([float(pole) for pole in poles])
+        offsets = 1e-6 * np.maximum(1.0, np.abs(centers))
+        defined = {"-": ~np.isnan(self.evaluate_many(centers - offsets)),
+                   "+": ~np.isnan(self.evaluate_many(centers + offsets))}
+        sides = [(pole, direction) for i, pole in enumerate(poles)
+                 for direction in "-+" if defined[direction][i]]
+        try:
+            start, end = self.domain.inf, self.domain.sup
+        except NotImplementedError:
+            start, end = -sp.oo, sp.oo
+        ends = [side for side, bound in (((sp.oo, "-"), end), ((-sp.oo, "+"), start))
+                if bound.is_infinite]
+        requests = [(self.expression, symb, point, direction)
+                    for point, direction in sides + ends]
+        requests += [(self.expression / symb, symb, point, direction)
+                     for point, direction in ends]
+        limits = cached_limits(requests, self.analysis_timeout)
+        one_sided = limits[:len(sides)]
+        at_infinity = limits[len(sides):len(sides) + len(ends)]
+        slopes = limits[len(sides) + len(ends):]
+        if any(limit is None for limit in one_sided + at_infinity):
+            return TIMEOUT
+
+        asymptotes = {"vertical_asymptotes": [], "horizontal_asymptote": [],
+                      "oblique_asymptote": []}
+        for (point, direction), limit in zip(sides, one_sided):
+            if limit.is_infinite:
+                asymptotes["vertical_asymptotes"].append(
+                    (f"{symb} -> {point}{direction}", f"f({symb}) -> {limit}"))
+        oblique = []
+        for (point, direction), limit, slope in zip(ends, at_infinity, slopes):
+            if limit.is_finite and limit.is_real:
+                asymptotes["horizontal_asymptote"].append(
+                    (f"{symb} -> {point}", f"f({symb}) -> {limit}"))
+            elif slope is None:
+                return TIMEOUT
+            elif slope.is_finite and slope.is_real and not slope.is_zero:
+                oblique.append((point, direction, slope))
+        intercepts = cached_limits(
+            [(self.expression - slope * symb, symb, point, direction)
+             for point, direction, slope in oblique], self.analysis_timeout)
+        if any(intercept is None for intercept in intercepts):
+            return TIMEOUT
+        for (point, _, slope), intercept in zip(oblique, intercepts):
+            if intercept.is_finite and intercept.is_real:
+                asymptotes["oblique_asymptote"].append(
+                    (f"{symb} -> {point}", f"y = {slope * symb + intercept}"))
         return asymptotes
 
-    def plot(self):
-        """Plot the function."""
+    def analyze(self, budget=None, workers=None):
+        """Run every analysis of the function and report the results.
+
+        The analyses form the dependency graph ``ANALYSES``. Shared
+        intermediates (the first two derivatives, the domain and the
+        singularities) are computed once in this process, so the forked
+        workers inherit them. Independent expensive analyses then run
+        concurrently, and the sign tables reuse the critical and
+        inflection points that were found.
+
+        Parameters
+        ==========
+            budget : `float`, `optional`
+                Seconds each worker analysis may run. Defaults to None,
+                no limit besides ``analysis_timeout``.
+            workers : `int`, `optional`
+                The maximum number of concurrent workers.
+                Defaults to the CPU count.
+
+        Returns
+        =======
+            dict
+                A JSON serializable report with the ``expression``, its
+                ``variable``, the ``analyses`` by name, and the names of
+                the analyses that ``timed_out`` or ``failed``, with their
+                error. Exact values are written as sympy strings.
+        """
+        self.__single_variable("analyze")
+        results = {}
+        while len(results) < len(ANALYSES):
+            ready = [name for name, (dependencies, _) in ANALYSES.items()
+                     if name not in results and all(d in results for d in dependencies)]
+            for name in ready:
+                blocked = [results[d] for d in ANALYSES[name][0]
+                           if results[d] is TIMEOUT or isinstance(results[d], Exception)]
+                if blocked:
+                    results[name] = blocked[0]
+            ready = [name for name in ready if name not in results]
+            parallel = [name for name in ready if ANALYSES[name][1]]
+            outcomes = map_with_budget(
+                self.__exporting, [(self.__analysis, name, results) for name in parallel],
+                budget, workers)
+            for name, outcome in zip(parallel, outcomes):
+                if outcome is not TIMEOUT and not isinstance(outcome, Exception):
+                    outcome, state = outcome
+                    self.__absorb(state)
+                results[name] = outcome
+            for name in ready:
+                if name not in parallel:
+                    try:
+                        results[name] = self.__analysis(name, results)
+                    except Exception as exc:  # pylint: disable=broad-except
+                        results[name] = exc
+        if not isinstance(results["range"], (Exception, type(TIMEOUT))):
+            self.range = results["range"]
+        return {
+            "expression": str(self.expression),
+            "variable": str(self.symbol),
+            "analyses": {name: None if value is TIMEOUT or isinstance(value, Exception)
+                         else serializable(value) for name, value in results.items()},
+            "timed_out": [name for name, value in results.items() if value is TIMEOUT],
+            "failed": {name: repr(value) for name, value in results.items()
+                       if isinstance(value, Exception)},
+        }
+
+    def __analysis(self, name, results):
+        """Run one step of ``analyze`` given the results of its dependencies."""
+        if name == "derivatives":
+            return [d.expression for d in self.derivative_tower(order=2)]
+        if name == "singularities":
+            return self.__poles(sp.S.Reals)
+        if name == "monotonicity":
+            return self.__monotonicity(None, results["critical_points"])
+        if name == "concavity":
+            return self.__concavity(None, results["inflection_points"])
+        value = getattr(self, name)
+        return value() if callable(value) else value
+
+    def plot(self, order=0):
+        """Plot the function.
+
+        Parameters
+        ==========
+            order : `int`, `optional`
+                Also plot the derivatives up to this order on the same
+                axes. Defaults to 0.
+        """
         from plot.plot import Plotter
-        Plotter.plot(func= self)
+        Plotter.plot(func=self, order=order)
+
+
+class _Approximate:
+    """A fallback result found because an exact one took too long
+
+    Such results depend on the time budget, so ``Function`` does not keep
+    them in the persistent cache.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        """Wrap the fallback result."""
+        self.value = value
+
+
+def serializable(value):
+    """Convert an analysis result to JSON serializable values."""
+    if isinstance(value, dict):
+        return {str(key): serializable(item) for key, item in value.items()}
+    if isinstance(value, (sp.MatrixBase, np.ndarray)):
+        return serializable(value.tolist())
+    if isinstance(value, (list, tuple)):
+        return [serializable(item) for item in value]
+    if isinstance(value, sp.Integer):
+        return int(value)
+    if isinstance(value, (sp.Float, np.floating)):
+        return float(value)
+    if isinstance(value, sp.Basic):
+        return str(value)
+    return value
+
+
+def _zeros_and_poles(expression, symbol):
+    """Solve for the real zeros and singularities of an expression with sympy."""
+    return sp.Union(
+        sp.solveset(expression, symbol, domain=sp.S.Reals),
+        sp.singularities(expression, symbol, domain=sp.S.Reals))
+
+
+def _symbolic_extrema(expression, symbol, domain):
+    """Find the maximum and minimum of an expression with sympy."""
+    return sp.maximum(expression, symbol, domain), sp.minimum(expression, symbol, domain)
+
+
+def _diverges(levels):
+    """Tell whether the largest values of successive probe levels grow without bound.
+
+    The values must grow by a significant step from the first level to
+    the second, and by at least half of it from the second to the third,
+    which excludes values converging to a finite limit.
+    """
+    if np.isposinf(levels).any():
+        return True
+    first, second = np.diff(levels)
+    return bool(first > 1e-2 * (1 + abs(levels[0])) and second >= first / 2)
+
+
+def _solve_critical_points(expression, derivative, symbol, interval):
+    """Solve for the critical points of an expression with sympy.
+
+    Returns
+    =======
+        list
+            The sorted critical points, or None if they are not
+            a finite set of real numbers.
+    """
+    points = sp.Union(
+        sp.singularities(expression, symbol, domain=interval),
+        sp.solveset(derivative, symbol, domain=interval))
+    if not isinstance(points, sp.FiniteSet) or not all(p.is_real for p in points):
+        return None
+    return sorted(points, key=float)
+
+
+def _picklable(results):
+    """Keep the results that can be sent from a worker process."""
+    kept = {}
+    for key, result in results.items():
+        try:
+            pickle.dumps(result)
+        except Exception:  # pylint: disable=broad-except
+            continue
+        kept[key] = result
+    return kept
 
 
 if __name__ == "__main__":
+    from timeit import timeit
+
     f = Function("ln(x)")
     print(f.evaluate(1))
+
+    points = np.linspace(0.5, 50, 100_000)
+    f.evaluate_many(points)
+    # Evaluating every point one by one would take minutes, so the time is
+    # extrapolated from a sample of them.
+    sampled = 100
+    loop = timeit(lambda: [f.evaluate(p) for p in points[:sampled]], number=1)
+    loop *= len(points) / sampled
+    batch = timeit(lambda: f.evaluate_many(points), number=10) / 10
+    print(f"evaluate: {loop:.3f}s (estimated from {sampled} points), "
+          f"evaluate_many: {batch:.5f}s for {len(points)} points ({loop / batch:.0f}x)")
+
+    g = Function("x^5*sin(x)*cos(x)")
+    tower = g.derivative_tower(order=20)
+    g.compile(order=20)(points)
+    separate = timeit(lambda: [d.evaluate_many(points) for d in tower], number=3) / 3
+    joint = timeit(lambda: g.compile(order=20)(points), number=3) / 3
+    print(f"order 20 tower: separate {separate:.4f}s, compiled jointly {joint:.4f}s "
+          f"({separate / joint:.1f}x)")
@@ -0,0 +1,165 @@
+"""Per-stage timing of the calculus operations
+
+Stages, such as ``sympify``, ``simplify``, ``function_range``,
+``solveset`` or ``limit``, are recorded with ``stage`` once ``enable`` is
+called. While disabled, ``stage`` returns a shared no-op context, so the
+instrumentation costs one function call.
+
+Stages recorded in the worker processes of ``advanced_calc.timeout``
+are merged into the calling process when the worker returns.
+"""
+
+from contextlib import nullcontext
+import threading
+import time
+
+_ENABLED = []
+_STATS = {}
+_LOCK = threading.Lock()
+_NOOP = nullcontext()
+
+
+class _Stage:
+    """Context recording the wall time of one run of a stage"""
+
+    __slots__ = ("name", "expression", "start")
+
+    def __init__(self, name, expression):
+        """Initialize the stage."""
+        self.name = name
+        self.expression = expression
+        self.start = None
+
+    def __enter__(self):
+        """Start the clock."""
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop the clock and record the run."""
+        record(self.name, time.perf_counter() - self.start, self.expression)
+
+
+def enable():
+    """Start recording the stages."""
+    _ENABLED[:] = [True]
+
+
+def disable():
+    """Stop recording the stages, keeping what was recorded."""
+    _ENABLED.clear()
+
+
+def is_enabled():
+    """Check if the stages are recorded."""
+    return bool(_ENABLED)
+
+
+def reset():
+    """Forget every recorded stage."""
+    with _LOCK:
+        _STATS.clear()
+
+
+def stage(name, expression=None):
+    """Time a stage of an operation.
+
+    Parameters
+    ==========
+        name : `str`
+            The name of the stage.
+        expression : `Expr`, `optional`
+            The expression the stage works on, whose size is recorded.
+            Defaults to None.
+
+    Returns
+    =======
+        context manager
+            Records the wall time of its block when enabled.
+    """
+    if not _ENABLED:
+        return _NOOP
+    return _Stage(name, expression)
+
+
+def record(name, seconds, expression=None):
+    """Record one run of a stage.
+
+    Parameters
+    ==========
+        name : `str`
+            The name of the stage.
+        seconds : `float`
+            The wall time of the run.
+        expression : `Expr`, `optional`
+            The expression the stage worked on. Defaults to None.
+    """
+    size = size_of(expression) if expression is not None else 0
+    merge({name: {"calls": 1, "seconds": seconds, "max_seconds": seconds, "max_size": size}})
+
+
+def merge(stats):
+    """Add stages recorded elsewhere, such as in a worker process.
+
+    Parameters
+    ==========
+        stats : `dict`
+            Stages as returned by ``report``.
+    """
+    with _LOCK:
+        for name, other in stats.items():
+            mine = _STATS.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0,
+                                            "max_size": 0})
+            mine["calls"] += other["calls"]
+            mine["seconds"] += other["seconds"]
+            mine["max_seconds"] = max(mine["max_seconds"], other["max_seconds"])
+            mine["max_size"] = max(mine["max_size"], other["max_size"])
+
+
+def size_of(expression):
+    """Get the number of nodes of an expression tree.
+
+    Parameters
+    ==========
+        expression : `Expr`
+            The expression to measure.
+
+    Returns
+    =======
+        int
+            The number of nodes, 0 if it is not a sympy expression.
+    """
+    import sympy as sp
+
+    if not isinstance(expression, sp.Basic):
+        return 0
+    return sum(1 for _ in sp.preorder_traversal(expression))
+
+
+def report():
+    """Get the recorded stages.
+
+    Returns
+    =======
+        dict
+            The ``calls``, total ``seconds``, ``max_seconds`` and the
+            ``max_size`` of the expressions of each stage.
+    """
+    with _LOCK:
+        return {name: dict(stats) for name, stats in _STATS.items()}
+
+
+def format_report():
+    """Format the recorded stages as a table, slowest first.
+
+    Returns
+    =======
+        str
+            One line per stage.
+    """
+    lines = [f"{'stage':24} {'calls':>7} {'total s':>10} {'max s':>10} {'max size':>9}"]
+    stages = sorted(report().items(), key=lambda item: -item[1]["seconds"])
+    for name, stats in stages:
+        lines.append(f"{name:24} {stats['calls']:7d} {stats['seconds']:10.4f} "
+                     f"{stats['max_seconds']:10.4f} {stats['max_size']:9d}")
+    return "\n".join(lines)
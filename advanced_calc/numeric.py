@@ -0,0 +1,310 @@
+"""Numeric helpers to evaluate sympy expressions over NumPy arrays"""
+
+import numpy as np
+import sympy as sp
+
+# Window searched numerically when a set extends to infinity.
+DEFAULT_WINDOW = (-100, 100)
+
+
+def compile_expression(expression, symbols):
+    """Compile an expression to a vectorized NumPy evaluator.
+
+    Functions NumPy does not provide (``LambertW``, ``zeta``, ...) are
+    evaluated point by point with mpmath instead. Expressions that cannot
+    be compiled at all, such as unevaluated derivatives, evaluate to NaN.
+
+    Parameters
+    ==========
+        expression : `Expr`
+            The expression to compile.
+        symbols : `list`
+            The arguments of the compiled function, in order.
+
+    Returns
+    =======
+        callable
+            A function taking one array per symbol and returning a float
+            ndarray, with NaN wherever the result is not real.
+    """
+    evaluator = compile_expressions([expression], symbols)
+    return lambda *values: evaluator(*values)[0]
+
+
+def compile_expressions(expressions, symbols):
+    """Compile many expressions jointly to one vectorized NumPy evaluator.
+
+    Common subexpressions are eliminated across all the expressions, so
+    the generated function computes each shared term, like the factors
+    repeated throughout a derivative tower, once per call.
+
+    Parameters
+    ==========
+        expressions : `list`
+            The expressions to compile.
+        symbols : `list`
+            The arguments of the compiled function, in order.
+
+    Returns
+    =======
+        callable
+            A function taking one array per symbol and returning a float
+            ndarray with one row per expression, NaN wherever the result
+            is not real.
+    """
+    symbols, expressions = list(symbols), list(expressions)
+    try:
+        fast = sp.lambdify(symbols, expressions, "numpy", cse=True)
+    except NotImplementedError:
+        fast = None
+    slow = []
+
+    def evaluator(*values):
+        values = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in values])
+        shape = values[0].shape if values else ()
+        with np.errstate(all="ignore"):
+            if fast is not None and not slow:
+                try:
+                    results = fast(*values)
+                except (NameError, TypeError, AttributeError):
+                    slow.extend(_pointwise(e, symbols) for e in expressions)
+            elif not slow:
+                slow.extend(_pointwise(e, symbols) for e in expressions)
+            if slow:
+                results = [function(*values) for function in slow]
+        output = np.empty((len(expressions),) + shape)
+        for i, result in enumerate(results):
+            result = np.broadcast_to(result, shape)
+            if np.iscomplexobj(result):
+                result = np.where(result.imag == 0, result.real, np.nan)
+            output[i] = result
+        return output
+
+    return evaluator
+
+
+def _pointwise(expression, symbols):
+    """Point by point evaluator with mpmath."""
+    try:
+        function = sp.lambdify(symbols, expression, "mpmath")
+    except NotImplementedError:
+        return lambda *values: np.full(np.shape(values[0]), np.nan)
+
+    def evaluate(*values):
+        try:
+            return complex(function(*values))
+        except (TypeError, ValueError, ZeroDivisionError):
+            return complex(np.nan)
+
+    return np.vectorize(evaluate, otypes=[complex])
+
+
+def set_mask(domain, values):
+    """Vectorized membership test of real values in a sympy set.
+
+    Parameters
+    ==========
+        domain : `Set`
+            The set to test against.
+        values : `ndarray`
+            The values to test.
+
+    Returns
+    =======
+        ndarray
+            Boolean array, True where the value belongs to the set.
+    """
+    values = np.asarray(values, dtype=float)
+    if domain is sp.S.Reals:
+        return np.ones(values.shape, dtype=bool)
+    if domain is sp.S.EmptySet:
+        return np.zeros(values.shape, dtype=bool)
+    if isinstance(domain, sp.Interval):
+        low, high = float(domain.inf), float(domain.sup)
+        above = values > low if domain.left_open else values >= low
+        below = values < high if domain.right_open else values <= high
+        return above & below
+    if isinstance(domain, sp.Union):
+        mask = np.zeros(values.shape, dtype=bool)
+        for part in domain.args:
+            mask |= set_mask(part, values)
+        return mask
+    if isinstance(domain, sp.Intersection):
+        mask = np.ones(values.shape, dtype=bool)
+        for part in domain.args:
+            mask &= set_mask(part, values)
+        return mask
+    if isinstance(domain, sp.Complement):
+        return set_mask(domain.args[0], values) & ~set_mask(domain.args[1], values)
+    if isinstance(domain, sp.FiniteSet) and all(e.is_real for e in domain):
+        return np.isin(values, [float(e) for e in domain])
+    if _is_lattice(domain):
+        variable = domain.lamda.variables[0]
+        slope = float(domain.lamda.expr.coeff(variable))
+        offset = float(domain.lamda.expr.subs(variable, 0))
+        steps = (values - offset) / slope
+        return np.isclose(steps, np.round(steps), rtol=0, atol=1e-12)
+    return np.vectorize(lambda value: _contains(domain, value), otypes=[bool])(values)
+
+
+def window_bounds(domain, window=None):
+    """Clip a window to the bounds of a set.
+
+    Parameters
+    ==========
+        domain : `Set`
+            The set to clip to.
+        window : `tuple`, `optional`
+            The ``(start, end)`` window. Defaults to ``DEFAULT_WINDOW``.
+
+    Returns
+    =======
+        tuple
+            The ``(start, end)`` floats, with ``start >= end`` if the
+            set does not meet the window.
+    """
+    start, end = (float(bound) for bound in window or DEFAULT_WINDOW)
+    if domain is sp.S.EmptySet:
+        return end, start
+    try:
+        return max(start, float(domain.inf)), min(end, float(domain.sup))
+    except (TypeError, ValueError, NotImplementedError):
+        return start, end
+
+
+def find_roots(func, start, end, derivative=None, points=2001,
+               tolerance=1e-9, iterations=100):
+    """Find the real roots of a vectorized function in an interval.
+
+    Roots are bracketed by sign changes on a uniform grid, and tangent
+    roots by local minima of ``|func|`` that are close to zero. Every
+    candidate is refined at once by safeguarded Newton iterations,
+    falling back to bisection inside brackets when the derivative is
+    missing or a step leaves the bracket. Candidates where ``func`` does
+    not vanish, such as poles with a sign change, are dropped.
+
+    Parameters
+    ==========
+        func : `callable`
+            Vectorized function returning NaN where it is undefined.
+        start, end : `float`
+            The finite interval to search.
+        derivative : `callable`, `optional`
+            Vectorized derivative of ``func``. Defaults to None.
+        points : `int`, `optional`
+            The size of the bracketing grid. Defaults to 2001.
+        tolerance : `float`, `optional`
+            Roots closer than this are merged. Defaults to 1e-9.
+        iterations : `int`, `optional`
+            The number of refinement steps. Defaults to 100.
+
+    Returns
+    =======
+        list
+            The sorted roots, as floats.
+    """
+    x = np.linspace(start, end, points)
+    y = func(x)
+    finite = np.isfinite(y)
+    with np.errstate(invalid="ignore"):
+        change = finite[:-1] & finite[1:] & (np.sign(y[:-1]) * np.sign(y[1:]) < 0)
+        inner = np.abs(y[1:-1])
+        dip = (inner <= np.abs(y[:-2])) & (inner <= np.abs(y[2:]))
+        dip &= finite[1:-1] & (inner < 1e-3 * np.maximum(1.0, np.abs(y[2:])))
+    left = np.flatnonzero(change)
+    low = np.concatenate([x[left], x[1:-1][dip] - (x[1] - x[0])])
+    high = np.concatenate([x[left + 1], x[1:-1][dip] + (x[1] - x[0])])
+    bracketed = np.concatenate([np.ones(len(left), bool), np.zeros(dip.sum(), bool)])
+    # Residuals are relative to the size of the function around each
+    # candidate, which may vary by hundreds of orders of magnitude.
+    scale = np.concatenate([np.abs(y[left]), np.abs(y[2:])[dip]])
+    scale = np.maximum(1.0, np.nan_to_num(scale, posinf=1.0))
+    roots = _refine(func, derivative, low, high, bracketed, iterations)
+    with np.errstate(invalid="ignore"):
+        residual = np.abs(func(roots))
+        valid = np.isfinite(roots) & (residual <= 1e-7 * scale)
+    roots = np.concatenate([roots[valid], x[y == 0]])
+    roots[np.abs(roots) < tolerance] = 0.0
+    merged = []
+    for root in np.sort(roots):
+        if not merged or root - merged[-1] > tolerance:
+            merged.append(float(root))
+    return merged
+
+
+def sign_table(func, intervals, atol=1e-12):
+    """Sign of a vectorized function on each of a list of intervals.
+
+    The function is evaluated at one test point per interval, all in one
+    call: the midpoint, or a point one unit inside an infinite interval.
+
+    Parameters
+    ==========
+        func : `callable`
+            Vectorized function returning NaN where it is undefined.
+        intervals : `list`
+            The ``[start, end]`` intervals, whose bounds may be infinite.
+        atol : `float`, `optional`
+            Values this close to zero have sign 0. Defaults to 1e-12.
+
+    Returns
+    =======
+        ndarray
+            The sign -1, 0 or 1 in each interval, NaN where undefined.
+    """
+    points = np.array([_test_point(float(a), float(b)) for a, b in intervals])
+    values = func(points) if len(points) else np.array([])
+    with np.errstate(invalid="ignore"):
+        return np.where(np.abs(values) <= atol, 0.0, np.sign(values))
+
+
+def _test_point(start, end):
+    """A point inside an interval whose bounds may be infinite."""
+    if np.isinf(start) and np.isinf(end):
+        return 0.0
+    if np.isinf(start):
+        return end - 1
+    if np.isinf(end):
+        return start + 1
+    return (start + end) / 2
+
+
+def _refine(func, derivative, low, high, bracketed, iterations):
+    """Safeguarded Newton iterations on many candidates at once."""
+    root = (low + high) / 2
+    sign_low = np.sign(func(low))
+    for _ in range(iterations):
+        value = func(root)
+        with np.errstate(all="ignore"):
+            if derivative is not None:
+                step = root - value / derivative(root)
+            else:
+                step = np.full(root.shape, np.nan)
+            same = np.sign(value) == sign_low
+            low = np.where(bracketed & same, root, low)
+            high = np.where(bracketed & ~same, root, high)
+            inside = np.isfinite(step) & (step >= low) & (step <= high)
+            inside |= ~bracketed & np.isfinite(step)
+        root = np.where(inside, step, (low + high) / 2)
+    return root
+
+
+def _is_lattice(domain):
+    """Check if a set is ``{a*n + b | n integer}``."""
+    if not isinstance(domain, sp.ImageSet) or domain.base_sets != (sp.S.Integers,):
+        return False
+    variables = domain.lamda.variables
+    if len(variables) != 1:
+        return False
+    expr = domain.lamda.expr
+    return (expr.is_polynomial(variables[0])
+            and sp.degree(expr, variables[0]) == 1
+            and not (expr.free_symbols - set(variables)))
+
+
+def _contains(domain, value):
+    """Membership test that treats undecidable cases as not contained."""
+    try:
+        return bool(domain.contains(value))
+    except TypeError:
+        return False
@@ -0,0 +1,125 @@
+"""Shared parsing layer for user expressions"""
+
+import io
+import tokenize
+import sympy as sp
+from sympy.core.sympify import SympifyError
+from advanced_calc.cache import LRUCache
+from advanced_calc.metrics import stage
+
+# Parsed expressions, or the parse error, keyed by the normalized input.
+PARSE_CACHE = LRUCache(maxsize=1024)
+
+# The names an expression may use, built on first parse, see _namespace.
+_NAMESPACE = {}
+
+
+def normalize(expression):
+    """Normalize the whitespace of an expression string.
+
+    Parameters
+    ==========
+        expression : `str`
+            The expression to normalize.
+
+    Returns
+    =======
+        str
+            The expression stripped, with runs of whitespace collapsed.
+    """
+    return " ".join(expression.split())
+
+
+def parse(expression):
+    """Parse an expression with sympy, caching the outcome.
+
+    Strings are looked up in ``PARSE_CACHE`` by their normalized form,
+    so the same input is only parsed once per process. As parsing
+    evaluates the string, they may not contain string literals, attribute
+    access or dunder names, and only see the sympy numbers, constants,
+    classes and functions, see ``_namespace``. Anything else is passed to
+    ``sympify`` in strict mode, which does not parse strings.
+
+    Parameters
+    ==========
+        expression : `str` or `Expr`
+            The expression to parse.
+
+    Returns
+    =======
+        Expr
+            The parsed expression.
+
+    Raises
+    ======
+        SympifyError, TypeError
+            If the expression cannot be parsed.
+    """
+    if not isinstance(expression, str):
+        return sp.sympify(expression, strict=True)
+    key = normalize(expression)
+    outcome = PARSE_CACHE.get(key)
+    if outcome is None:
+        try:
+            with stage("sympify"):
+                outcome = (_parse_string(key), None)
+        except (SympifyError, TypeError) as exc:
+            outcome = (None, exc)
+        PARSE_CACHE.put(key, outcome)
+    parsed, error = outcome
+    if error is not None:
+        raise type(error)(*error.args)
+    return parsed
+
+
+def _parse_string(expression):
+    """Parse a string with the restricted namespace.
+
+    Raises
+    ======
+        SympifyError
+            If the string is not a safe and valid expression.
+    """
+    from sympy.parsing.sympy_parser import (
+        convert_xor, parse_expr, standard_transformations)
+
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(expression).readline))
+    except (tokenize.TokenError, SyntaxError) as exc:
+        raise SympifyError(expression, exc) from exc
+    for token in tokens:
+        if token.type == tokenize.STRING or token.string == "." or "__" in token.string:
+            raise SympifyError(expression, ValueError(f"{token.string!r} is not allowed"))
+    try:
+        return parse_expr(expression, global_dict=_namespace(),
+                          transformations=standard_transformations + (convert_xor,))
+    except SympifyError:
+        raise
+    except Exception as exc:  # pylint: disable=broad-except
+        raise SympifyError(expression, exc) from exc
+
+
+def _namespace():
+    """Get the names an expression may use.
+
+    These are the sympy numbers and constants, the sympy classes, such as
+    ``sin`` or ``Integral``, and the functions of ``sympy.functions``,
+    such as ``sqrt``, without builtins or helpers like ``sympify`` that
+    would parse strings again. Other names become symbols.
+
+    Returns
+    =======
+        dict
+            The global namespace of the parsed expressions.
+    """
+    if not _NAMESPACE:
+        for name, value in vars(sp).items():
+            if name.startswith("_"):
+                continue
+            if (isinstance(value, sp.Basic)
+                    or (isinstance(value, type) and issubclass(value, sp.Basic))
+                    or (callable(value)
+                        and getattr(value, "__module__", "").startswith("sympy.functions"))):
+                _NAMESPACE[name] = value
+        _NAMESPACE.update(abs=sp.Abs, max=sp.Max, min=sp.Min, __builtins__={})
+    return _NAMESPACE
@@ -0,0 +1,354 @@
+"""Helpers to bound the running time of symbolic computations"""
+
+import multiprocessing
+from multiprocessing.connection import wait
+import os
+import signal
+import threading
+import time
+from advanced_calc import metrics
+
+
+class TimedOut:
+    """Marker returned by computations that exceeded their time budget"""
+
+    def __repr__(self):
+        """Represent the marker."""
+        return "TIMEOUT"
+
+
+TIMEOUT = TimedOut()
+
+
+class _Expired(BaseException):
+    """Raised by the SIGALRM handler when a call_with_timeout deadline passes
+
+    It is not an ``Exception``, so that sympy does not catch it.
+    """
+
+
+# The monotonic deadlines of the nested call_with_timeout calls running
+# in the main thread, innermost last, and those _Expired was raised for.
+_DEADLINES = []
+_EXPIRED = set()
+
+if hasattr(os, "register_at_fork"):
+    # Timers are not inherited, so neither are the deadlines.
+    os.register_at_fork(after_in_child=lambda: (_DEADLINES.clear(), _EXPIRED.clear()))
+
+
+def run_with_budget(func, budget, *args, **kwargs):
+    """Run a function in a worker process, killing it after a budget.
+
+    The function and its arguments should be picklable, since worker
+    processes are spawned on platforms without ``fork``. Inside daemonic
+    processes, which cannot have children, the function runs inline.
+
+    Parameters
+    ==========
+        func : `callable`
+            The function to call.
+        budget : `float`
+            Seconds the worker may run. ``None`` calls the function
+            in the current process, without a limit.
+
+    Returns
+    =======
+        object
+            The result of the call, or ``TIMEOUT`` if the budget expired.
+
+    Raises
+    ======
+        Exception
+            Any exception raised by the function is re-raised.
+    """
+    if budget is None or multiprocessing.current_process().daemon:
+        return func(*args, **kwargs)
+    context = _context()
+    reader, writer = context.Pipe(duplex=False)
+    worker = context.Process(target=_work, args=(writer, func, args, kwargs))
+    worker.start()
+    writer.close()
+    try:
+        if not reader.poll(budget):
+            return TIMEOUT
+        try:
+            failed, value = _receive(reader)
+        except EOFError:
+            failed, value = True, RuntimeError("The worker process died")
+    finally:
+        if worker.is_alive():
+            worker.kill()
+        worker.join()
+        reader.close()
+    if failed:
+        raise value
+    return value
+
+
+def map_with_budget(func, calls, budget, workers=None):
+    """Run many calls concurrently, each in a worker process with a budget.
+
+    At most ``workers`` processes run at once. Each one is killed when
+    its own budget expires. Inside daemonic processes, which cannot have
+    children, the calls run inline and one after the other.
+
+    Parameters
+    ==========
+        func : `callable`
+            The function to call.
+        calls : `iterable`
+            The tuple of positional arguments of each call.
+        budget : `float`
+            Seconds each worker may run. ``None`` means no limit.
+        workers : `int`, `optional`
+            The maximum number of concurrent workers.
+            Defaults to the CPU count.
+
+    Returns
+    =======
+        list
+            The result of each call in order: its return value, the
+            exception it raised, or ``TIMEOUT``.
+    """
+    calls = list(calls)
+    outcomes = [TIMEOUT] * len(calls)
+    if multiprocessing.current_process().daemon:
+        for i, args in enumerate(calls):
+            try:
+                outcomes[i] = func(*args)
+            except Exception as exc:  # pylint: disable=broad-except
+                outcomes[i] = exc
+        return outcomes
+    context = _context()
+    workers = workers or os.cpu_count() or 1
+    pending = list(enumerate(calls))
+    running = {}
+    while pending or running:
+        while pending and len(running) < workers:
+            i, args = pending.pop(0)
+            reader, writer = context.Pipe(duplex=False)
+            worker = context.Process(target=_work, args=(writer, func, args, {}))
+            worker.start()
+            writer.close()
+            deadline = None if budget is None else time.monotonic() + budget
+            running[reader] = (i, worker, deadline)
+        deadlines = [entry[2] for entry in running.values() if entry[2] is not None]
+        timeout = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+        for reader in wait(list(running), timeout):
+            i, worker, _ = running.pop(reader)
+            try:
+                _, value = _receive(reader)
+            except EOFError:
+                value = RuntimeError("The worker process died")
+            worker.join()
+            reader.close()
+            outcomes[i] = value
+        now = time.monotonic()
+        for reader, (i, worker, deadline) in list(running.items()):
+            if deadline is not None and now >= deadline:
+                worker.kill()
+                worker.join()
+                reader.close()
+                del running[reader]
+    return outcomes
+
+
+async def await_with_budget(func, budget, *args, **kwargs):
+    """Run a function in a worker process without blocking the event loop.
+
+    The worker is killed when the budget expires or when the awaiting
+    task is cancelled.
+
+    Parameters
+    ==========
+        func : `callable`
+            The function to call.
+        budget : `float`
+            Seconds the worker may run. ``None`` means no limit.
+
+    Returns
+    =======
+        object
+            The result of the call, or ``TIMEOUT`` if the budget expired.
+
+    Raises
+    ======
+        Exception
+            Any exception raised by the function is re-raised.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    context = _context()
+    reader, writer = context.Pipe(duplex=False)
+    worker = context.Process(target=_work, args=(writer, func, args, kwargs))
+    worker.start()
+    writer.close()
+    ready = loop.create_future()
+    loop.add_reader(reader.fileno(), lambda: ready.done() or ready.set_result(None))
+    try:
+        try:
+            await asyncio.wait_for(ready, budget)
+        except asyncio.TimeoutError:
+            return TIMEOUT
+        try:
+            failed, value = _receive(reader)
+        except EOFError:
+            failed, value = True, RuntimeError("The worker process died")
+    finally:
+        loop.remove_reader(reader.fileno())
+        if worker.is_alive():
+            worker.kill()
+        while worker.is_alive():
+            await asyncio.sleep(0.01)
+        worker.join()
+        reader.close()
+    if failed:
+        raise value
+    return value
+
+
+def call_with_timeout(func, timeout, default, *args, **kwargs):
+    """Call a function and give up on it after a timeout.
+
+    In the main thread, the call runs in this process and is interrupted
+    by a ``SIGALRM`` timer, unless another handler owns the signal. Calls
+    may be nested, an inner timeout never outliving an outer one.
+    Elsewhere, the call runs in a daemon thread, which keeps running in
+    the background after the timeout until it returns. No process is
+    forked, which is unsafe from threads holding locks, and too slow for
+    the many short calls of the analyses, see ``run_with_budget``.
+
+    Parameters
+    ==========
+        func : `callable`
+            The function to call.
+        timeout : `float`
+            Seconds to wait for the result. ``None`` waits forever
+            and calls the function in the current process.
+        default : `object`
+            The value returned when the timeout expires.
+
+    Returns
+    =======
+        object
+            The result of the call, or ``default`` on timeout.
+
+    Raises
+    ======
+        Exception
+            Any exception raised by the function is re-raised.
+    """
+    if timeout is None:
+        return func(*args, **kwargs)
+    if _can_alarm():
+        return _call_with_alarm(func, timeout, default, args, kwargs)
+    return _call_in_thread(func, timeout, default, args, kwargs)
+
+
+def _can_alarm():
+    """Tell whether a call in this thread can be interrupted by SIGALRM."""
+    return (hasattr(signal, "setitimer")
+            and threading.current_thread() is threading.main_thread()
+            and signal.getsignal(signal.SIGALRM) in (signal.SIG_DFL, _expire))
+
+
+def _call_with_alarm(func, timeout, default, args, kwargs):
+    """Call a function in this process, interrupting it after a timeout."""
+    deadline = time.monotonic() + timeout
+    try:
+        # The timer may fire as soon as it is armed, even before the call.
+        if not _DEADLINES:
+            signal.signal(signal.SIGALRM, _expire)
+        _DEADLINES.append(deadline)
+        _arm()
+        return func(*args, **kwargs)
+    except _Expired:
+        if time.monotonic() < deadline:
+            raise
+        return default
+    finally:
+        if deadline in _DEADLINES:
+            _DEADLINES.remove(deadline)
+        _EXPIRED.discard(deadline)
+        _arm()
+        if not _DEADLINES:
+            signal.signal(signal.SIGALRM, signal.SIG_DFL)
+
+
+def _arm():
+    """Set the SIGALRM timer to the earliest deadline, if any."""
+    if _DEADLINES:
+        signal.setitimer(signal.ITIMER_REAL, max(min(_DEADLINES) - time.monotonic(), 1e-6))
+    else:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _expire(signum, frame):  # pylint: disable=unused-argument
+    """Handle SIGALRM by interrupting the calls whose deadline passed.
+
+    ``_Expired`` is raised once per deadline, as it may still be
+    unwinding inner calls towards the one it belongs to.
+    """
+    if not _DEADLINES:
+        return
+    deadline = min(_DEADLINES)
+    if time.monotonic() < deadline:
+        _arm()
+    elif deadline not in _EXPIRED:
+        _EXPIRED.add(deadline)
+        raise _Expired()
+
+
+def _call_in_thread(func, timeout, default, args, kwargs):
+    """Call a function in a daemon thread, giving up on it after a timeout."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = func(*args, **kwargs)
+        except Exception as exc:  # pylint: disable=broad-except
+            outcome["error"] = exc
+
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        return default
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def _context():
+    """Multiprocessing context, forking where possible for a fast start."""
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def _work(connection, func, args, kwargs):
+    """Body of the worker process, sending back the outcome of the call.
+
+    The stages recorded by the worker, if profiling, are sent along.
+    """
+    metrics.reset()
+    try:
+        outcome = (False, func(*args, **kwargs))
+    except Exception as exc:  # pylint: disable=broad-except
+        outcome = (True, exc)
+    stats = metrics.report() if metrics.is_enabled() else None
+    try:
+        connection.send(outcome + (stats,))
+    except Exception as exc:  # pylint: disable=broad-except
+        connection.send((True, RuntimeError(repr(exc)), stats))
+    connection.close()
+
+
+def _receive(connection):
+    """Receive the outcome of a worker, merging the stages it recorded."""
+    failed, value, stats = connection.recv()
+    if stats:
+        metrics.merge(stats)
+    return failed, value
@@ -0,0 +1,273 @@
+"""Compact, immutable and interned function values
+
+``Function`` keeps a ``Derivative``, memo dictionaries and its parsed
+expression per instance. ``FunctionValue`` only keeps the canonical
+form of the expression, see ``advanced_calc.canonical``, in
+``__slots__``, and equivalent expressions share one interned value::
+
+    >>> FunctionValue("x*(x + 3)") is FunctionValue("x^2 + 3*x")
+    True
+
+Analyses are computed on first request by a ``Function`` attached to
+the value, and attached to it along with their results, so values
+holding no analysis stay small.
+"""
+
+import threading
+import weakref
+import sympy as sp
+from sympy.core.sympify import SympifyError
+from advanced_calc.canonical import canonical
+from advanced_calc.timeout import TIMEOUT
+
+# The live values, by canonical form.
+_INTERNED = weakref.WeakValueDictionary()
+_LOCK = threading.Lock()
+
+
+class FunctionValue:
+    """An immutable and hashable function of one expression"""
+
+    __slots__ = ("expression", "__function", "__analyses", "__weakref__")
+
+    def __new__(cls, expression):
+        """Get the value of an expression, interned.
+
+        Parameters
+        ==========
+            expression : `str` or `Expr`
+                The expression of the function.
+
+        Returns
+        =======
+            FunctionValue
+                The only live value of the canonical form of the
+                expression.
+
+        Raises
+        ======
+            ValueError
+                If the expression is invalid.
+        """
+        if isinstance(expression, FunctionValue):
+            return expression
+        try:
+            expression = canonical(expression)
+        except (SympifyError, TypeError) as exc:
+            raise ValueError("Invalid expression") from exc
+        with _LOCK:
+            value = _INTERNED.get(expression)
+            if value is None:
+                value = super().__new__(cls)
+                object.__setattr__(value, "expression", expression)
+                object.__setattr__(value, "_FunctionValue__function", None)
+                object.__setattr__(value, "_FunctionValue__analyses", None)
+                _INTERNED[expression] = value
+        return value
+
+    def __setattr__(self, name, value):
+        """Refuse to modify the value."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        """Refuse to modify the value."""
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        """Compare the expressions of two values."""
+        if not isinstance(other, FunctionValue):
+            return NotImplemented
+        return self is other or self.expression == other.expression
+
+    def __hash__(self):
+        """Hash the expression of the value."""
+        return hash(self.expression)
+
+    def __reduce__(self):
+        """Pickle the expression only, interning it again when loaded."""
+        return (FunctionValue, (self.expression,))
+
+    def __repr__(self):
+        """Represent the value."""
+        return f"FunctionValue({str(self.expression)!r})"
+
+    @property
+    def key(self):
+        """Get the key of the value, stable across processes.
+
+        Returns
+        =======
+            str
+                The ``srepr`` of the canonical form
+        """
+        return sp.srepr(self.expression)
+
+    @property
+    def symbols(self):
+        """Get the arguments of the function.
+
+        Returns
+        =======
+            tuple
+                The free symbols of the expression, sorted by name
+        """
+        return tuple(sorted(self.expression.free_symbols, key=str))
+
+    @property
+    def function(self):
+        """Get the Function computing the analyses of the value.
+
+        It is created on first use and shares its memoized domain,
+        derivatives and singularities between the analyses.
+
+        Returns
+        =======
+            Function
+                The function of the expression
+        """
+        if self.__function is None:
+            from advanced_calc.function import Function
+
+            object.__setattr__(self, "_FunctionValue__function", Function(self.expression))
+        return self.__function
+
+    def analysis(self, name, **arguments):
+        """Get an analysis of the function, computed once per value.
+
+        Results are attached to the value, so every holder of an
+        equivalent value shares them. Timed out analyses are not kept.
+
+        Parameters
+        ==========
+            name : `str`
+                The property or method of ``Function``, such as
+                ``"domain"`` or ``"critical_points"``.
+            **arguments
+                The keyword arguments of the method, which must be
+                hashable.
+
+        Returns
+        =======
+            object
+                The result of the analysis.
+        """
+        def compute():
+            result = getattr(self.function, name)
+            return result(**arguments) if callable(result) else result
+
+        return self.attached((name, tuple(sorted(arguments.items()))), compute)
+
+    @property
+    def domain(self):
+        """Get the domain of the function."""
+        return self.analysis("domain")
+
+    @property
+    def range(self):
+        """Get the range of the function."""
+        return self.analysis("range")
+
+    def derivative(self, order=1):
+        """Get the derivative of the function as a value.
+
+        Parameters
+        ==========
+            order : `int`, `optional`
+                The order of differentiation. Defaults to 1.
+
+        Returns
+        =======
+            FunctionValue
+                The value of the derivative
+        """
+        return self.attached(
+            ("derivative", order),
+            lambda: FunctionValue(self.function.diffrentiate(order=order).expression))
+
+    def attached(self, key, compute):
+        """Get a result attached to the value, computing it if missing.
+
+        Results that are ``TIMEOUT`` are returned without being attached.
+
+        Parameters
+        ==========
+            key : `hashable`
+                Identifies the result among those of the value.
+            compute : `callable`
+                Computes the result on a miss.
+
+        Returns
+        =======
+            object
+                The attached or computed result.
+        """
+        if self.__analyses is None:
+            object.__setattr__(self, "_FunctionValue__analyses", {})
+        if key not in self.__analyses:
+            result = compute()
+            if result is TIMEOUT:
+                return result
+            self.__analyses[key] = result
+        return self.__analyses[key]
+
+    def attachments(self):
+        """Get the results attached to the value.
+
+        Returns
+        =======
+            dict
+                The attached results, by key.
+        """
+        return dict(self.__analyses or {})
+
+    def attach(self, results):
+        """Attach results computed elsewhere, such as in a worker process.
+
+        Results already attached are kept.
+
+        Parameters
+        ==========
+            results : `dict`
+                The results to attach, by key.
+        """
+        if self.__analyses is None:
+            object.__setattr__(self, "_FunctionValue__analyses", {})
+        for key, result in results.items():
+            self.__analyses.setdefault(key, result)
+
+    def forget(self):
+        """Detach the Function and the analyses, freeing their memory."""
+        object.__setattr__(self, "_FunctionValue__function", None)
+        object.__setattr__(self, "_FunctionValue__analyses", None)
+
+
+def interned():
+    """Get the number of live values.
+
+    Returns
+    =======
+        int
+            The size of the intern table
+    """
+    return len(_INTERNED)
+
+
+if __name__ == "__main__":
+    import tracemalloc
+    import sympy as sp
+    from advanced_calc.function import Function
+
+    x = sp.Symbol("x")
+    expressions = [x**2 + n for n in range(100_000)]
+
+    def per_instance(kind):
+        """Measure the bytes allocated per instance of a kind."""
+        tracemalloc.start()
+        instances = [kind(expression) for expression in expressions]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del instances
+        return size / len(expressions)
+
+    print(f"Function      {per_instance(Function):8.0f} bytes per instance")
+    print(f"FunctionValue {per_instance(FunctionValue):8.0f} bytes per instance")
@@ -9,7 +9,10 @@ Classes:
     BasicCalc: A class to validate and evaluate mathematical expressions.
 """
 
+import os
 import sympy as sp
+from advanced_calc.metrics import stage
+from advanced_calc.parser import normalize, parse
 
 
 class BasicCalculator:
@@ -17,26 +20,35 @@ class BasicCalculator:
     A basic calculator class for evaluating mathematical expressions.
     """
 
-    def __init__(self, expr):
+    def __init__(self, expr, exact=False, precision=15):
         """
         Initializes the calculator with a given expression.
 
         :param expr: A string representing the mathematical expression.
+        :param exact: Simplify the expression before evaluating it,
+            instead of evaluating the parsed expression numerically.
+        :param precision: The number of significant digits used by evalf.
         """
+        self.exact = exact
+        self.precision = precision
         self.expression = expr
         self.result = None
 
     @property
     def expression(self):
-        """get the expression"""
-        return self.__expression
+        """get the simplified expression, computed on first access"""
+        if self.__simplified is None:
+            with stage("simplify", self.__parsed):
+                self.__simplified = sp.simplify(self.__parsed)
+        return self.__simplified
 
     @expression.setter
     def expression(self, expression):
         """set the expression"""
         if not self.is_valid_expression(expression):
             raise ValueError("Invalid expression")
-        self.__expression = sp.simplify(expression)
+        self.__parsed = parse(expression)
+        self.__simplified = None
 
     @staticmethod
     def is_valid_expression(expression):
@@ -47,24 +59,104 @@ class BasicCalculator:
         :return: True if the expression is valid, False otherwise.
         """
         try:
-            sp.sympify(expression)
+            parsed = parse(expression)
         except (sp.SympifyError, TypeError):
             return False
-        free_sym = list(sp.sympify(expression).free_symbols)
+        free_sym = list(parsed.free_symbols)
         return len(free_sym) == 0
 
     def evaluate_expression(self):
         """
         Calculates the result of the mathematical expression if it is valid.
+
+        In exact mode the expression is simplified first, otherwise the
+        parsed expression goes straight to evalf with ``precision`` digits.
         :return:
            evaluated result of the expression formatted to three decimal,
            or a string "invalid expression".
         """
-        return round(float(self.__expression.evalf()), 3)
+        expression = self.expression if self.exact else self.__parsed
+        with stage("evalf", expression):
+            return round(float(expression.evalf(self.precision)), 3)
+
+    @staticmethod
+    def evaluate_batch(expressions, workers=None, parallel_threshold=256):
+        """
+        Evaluates many expressions, yielding the results in input order.
+
+        Identical expressions, up to whitespace, are evaluated only once,
+        as the first of them is written. They are not canonicalized, see
+        ``advanced_calc.canonical``, which would cost about as much as
+        evaluating them. When there are at least ``parallel_threshold``
+        distinct expressions, they are spread over a process pool, whose
+        pending work is cancelled if the generator is closed early.
+
+        :param expressions: An iterable of expression strings.
+        :param workers: The number of worker processes,
+            defaults to the CPU count.
+        :param parallel_threshold: The number of distinct expressions from
+            which a process pool is used.
+        :return: A generator of results formatted to three decimals, with the
+            ValueError instance in place of each invalid expression.
+        """
+        expressions = list(expressions)
+        keys = [_batch_key(expression) for expression in expressions]
+        firsts = {}
+        for key, expression in zip(keys, expressions):
+            firsts.setdefault(key, expression)
+        if len(firsts) < parallel_threshold:
+            yield from _in_order(keys, firsts, map(_evaluate, firsts.values()))
+            return
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(firsts) // (workers * 4))
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            yield from _in_order(
+                keys, firsts,
+                pool.map(_evaluate, firsts.values(), chunksize=chunksize))
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+
+def _batch_key(expression):
+    """Key used to deduplicate the expressions of a batch."""
+    return normalize(expression) if isinstance(expression, str) else expression
+
+
+def _evaluate(expression):
+    """Evaluate one expression of a batch, returning errors as values."""
+    try:
+        return BasicCalculator(expression).evaluate_expression()
+    except ValueError as exc:
+        return exc
+    except TypeError as exc:
+        return ValueError(str(exc))
+
+
+def _in_order(keys, firsts, outcomes):
+    """Yield the outcomes of the distinct expressions for every input."""
+    results = {}
+    pending = iter(firsts)
+    for key in keys:
+        while key not in results:
+            results[next(pending)] = next(outcomes)
+        yield results[key]
 
 
 if __name__ == "__main__":
+    from timeit import timeit
+
     expr = "sin(pi)+cos(pi)+tan(pi/4)+asec(1)-sinh(pi)"
     calculator = BasicCalculator(expr)
     result = calculator.evaluate_expression()
     print(f"Result: {result}")
+
+    parse(expr)
+    for exact in (False, True):
+        seconds = timeit(
+            lambda mode=exact: BasicCalculator(
+                expr, exact=mode).evaluate_expression(),
+            number=20) / 20
+        print(f"exact={exact}: {seconds * 1000:.2f} ms per evaluation")
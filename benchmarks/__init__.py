@@ -0,0 +1 @@
+"""Benchmarks of the DerivativeXpert hot paths, run with ``python -m benchmarks``."""
@@ -0,0 +1,62 @@
+"""Run the benchmarks and compare them to the stored baseline.
+
+    python -m benchmarks                    # compare to benchmarks/baseline.json
+    python -m benchmarks --save             # store the timings as the baseline
+    python -m benchmarks -k evaluate_many   # run some benchmarks only
+
+Exits with status 1 if a case is slower than its baseline by more than
+the threshold. Baselines from another host are rescaled by the time each
+host takes to run a reference workload, and baselines from another
+Python or sympy version are not compared at all.
+"""
+
+import argparse
+import sys
+from benchmarks.suite import (
+    BASELINE, BENCHMARKS, calibrate, compare, load_baseline, machine, run, save_baseline)
+
+
+def main(argv=None):
+    """Parse the arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--benchmark", action="append", choices=list(BENCHMARKS),
+                        help="run this benchmark only, may be repeated")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each case")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="allowed ratio of the new to the baseline time")
+    parser.add_argument("--baseline", default=BASELINE, help="the baseline file")
+    parser.add_argument("--save", action="store_true", help="store the timings as baseline")
+    args = parser.parse_args(argv)
+
+    stored, baseline = load_baseline(args.baseline)
+    current = machine()
+    scale = calibrate(stored, current) if stored else 1.0
+    if scale is None:
+        print(f"The baseline comes from Python {stored['python']} and sympy "
+              f"{stored['sympy']}, its timings are not compared")
+        baseline = {}
+    elif stored and stored.get("host") != current["host"]:
+        print(f"The baseline comes from {stored.get('host', 'an unknown host')}, "
+              f"its timings are rescaled by {scale:.2f}")
+
+    def report(case, timing):
+        previous = baseline.get(case)
+        change = f"{timing['min'] / (previous['min'] * scale):6.2f}x" if previous else "   new"
+        print(f"{case:55} {timing['min'] * 1000:10.3f} ms {change}")
+
+    results = run(args.benchmark, args.repeat, report)
+    if args.save:
+        # Timings of another machine are not kept along those of this one.
+        kept = baseline if stored.get("host") == current["host"] else {}
+        save_baseline({**kept, **results}, args.baseline, current)
+        print(f"Saved {len(results)} cases to {args.baseline}")
+        return 0
+    regressions = compare(results, baseline, args.threshold, scale)
+    for case, ratio in sorted(regressions.items()):
+        print(f"REGRESSION {case}: {ratio:.2f}x slower than the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
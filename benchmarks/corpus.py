@@ -0,0 +1,32 @@
+"""Representative expressions the benchmarks run on"""
+
+# (expression, a point of its domain) for Function and Plotter.
+FUNCTIONS = [
+    ("x**3 - 3*x", 2),
+    ("(x**2 + 1)/(x - 2)", 1),
+    ("sin(x)*cos(x)", 1),
+    ("x**2*exp(-x)", 1),
+    ("ln(x)/x", 2),
+    ("sqrt(x**2 + 1) - x", 1),
+    ("tan(x)", 1),
+]
+
+# Expressions for BasicCalculator.
+ARITHMETIC = [
+    "2 + 3*4 - 5/7",
+    "sqrt(2)*sqrt(8) + ln(E^3)",
+    "sin(pi/6)^2 + cos(pi/6)^2",
+    "(1 + 1/1000)^1000",
+    "factorial(20)/factorial(18)",
+]
+
+# Expressions for high order derivatives, those of tan(x) taking minutes.
+HIGH_ORDER = [entry for entry in FUNCTIONS if entry[0] != "tan(x)"]
+
+# Modules imported by a fresh interpreter, as the CLI and workers do.
+MODULES = [
+    "main",
+    "advanced_calc.function",
+    "basic_calculator.basic_calc",
+    "service.batch",
+]
@@ -0,0 +1,264 @@
+"""The benchmarks, their measurement and the comparison to a baseline"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+import sympy as sp
+from sympy.core.cache import clear_cache
+from advanced_calc.cache import (
+    DERIVATIVE_CACHE, LIMIT_CACHE, disable_persistent_cache)
+from advanced_calc.canonical import CANONICAL_CACHE, INTERNED
+from advanced_calc.derivative import Derivative
+from advanced_calc.function import Function
+from advanced_calc.parser import PARSE_CACHE
+from basic_calculator.basic_calc import BasicCalculator
+from benchmarks.corpus import ARITHMETIC, FUNCTIONS, HIGH_ORDER, MODULES
+from plot.sampling import sample
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Timings faster than this many seconds are never reported as regressions.
+NOISE_FLOOR = 1e-3
+
+POINTS = np.linspace(0.5, 50, 100_000)
+
+
+def _function(expression, _):
+    """Set up a benchmark of the Function construction."""
+    return lambda: Function(expression)
+
+
+def _evaluate(expression, point):
+    """Set up a benchmark of the exact evaluation at one point."""
+    function = Function(expression)
+    function.domain  # pylint: disable=pointless-statement
+    return lambda: function.evaluate(point)
+
+
+def _evaluate_many(expression, _):
+    """Set up a benchmark of the vectorized evaluation."""
+    function = Function(expression)
+    function.evaluate_many(POINTS[:1])
+    return lambda: function.evaluate_many(POINTS)
+
+
+def _diffrentiate(order):
+    """Set up benchmarks of Derivative.diffrentiate at one order."""
+    def setup(expression, _):
+        function = Function(expression)
+        return lambda: Derivative().diffrentiate(function=function, order=order)
+    return setup
+
+
+def _analysis(name):
+    """Set up benchmarks of an analysis method on a new Function."""
+    def setup(expression, _):
+        function = Function(expression)
+        return lambda: getattr(function, name)()
+    return setup
+
+
+def _sample(expression, _):
+    """Set up a benchmark of the headless plot sampling."""
+    function = Function(expression)
+    function.domain  # pylint: disable=pointless-statement
+    return lambda: sample(function)
+
+
+def _basic(expression):
+    """Set up a benchmark of BasicCalculator.evaluate_expression."""
+    return lambda: BasicCalculator(expression).evaluate_expression()
+
+
+def _import(module):
+    """Set up a benchmark of importing a module in a new interpreter."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-c", f"import {module}"]
+    return lambda: subprocess.run(command, cwd=root, check=True)
+
+
+# name -> (setup taking a corpus entry and returning the timed call, corpus)
+BENCHMARKS = {
+    "function_init": (_function, FUNCTIONS),
+    "evaluate": (_evaluate, FUNCTIONS),
+    "evaluate_many": (_evaluate_many, FUNCTIONS),
+    "diffrentiate_1": (_diffrentiate(1), FUNCTIONS),
+    "diffrentiate_5": (_diffrentiate(5), FUNCTIONS),
+    "diffrentiate_20": (_diffrentiate(20), HIGH_ORDER),
+    "critical_points": (_analysis("critical_points"), FUNCTIONS),
+    "concavity": (_analysis("concavity"), FUNCTIONS),
+    "asymptotes": (_analysis("asymptotes"), FUNCTIONS),
+    "basic_evaluate": (_basic, [(expression,) for expression in ARITHMETIC]),
+    "plot_sample": (_sample, FUNCTIONS),
+    "import": (_import, [(module,) for module in MODULES]),
+}
+
+
+def cold():
+    """Empty every cache, so each run starts from the same state."""
+    disable_persistent_cache()
+    for cache in (DERIVATIVE_CACHE, LIMIT_CACHE, PARSE_CACHE, CANONICAL_CACHE, INTERNED):
+        cache.clear()
+    clear_cache()
+
+
+def measure(setup, repeat=3):
+    """Time a benchmark, starting every run from cold caches.
+
+    Parameters
+    ==========
+        setup : `callable`
+            Returns the call to time. Its own cost is not measured.
+        repeat : `int`, `optional`
+            The number of runs. Defaults to 3.
+
+    Returns
+    =======
+        dict
+            The ``min`` and ``median`` seconds of the runs.
+    """
+    timings = []
+    for _ in range(repeat):
+        cold()
+        call = setup()
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+        # Free the analyses attached to the interned values of the run.
+        del call
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+
+def run(names=None, repeat=3, report=None):
+    """Run benchmarks over their corpus.
+
+    Parameters
+    ==========
+        names : `list`, `optional`
+            The benchmarks to run. Defaults to None, all of them.
+        repeat : `int`, `optional`
+            The number of runs of each case. Defaults to 3.
+        report : `callable`, `optional`
+            Called with the name and timings of each case once measured.
+
+    Returns
+    =======
+        dict
+            The timings of each ``benchmark[expression]`` case.
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        setup, corpus = BENCHMARKS[name]
+        for entry in corpus:
+            case = f"{name}[{entry[0]}]"
+            results[case] = measure(lambda entry=entry: setup(*entry), repeat)
+            if report:
+                report(case, results[case])
+    return results
+
+
+def compare(results, baseline, threshold=1.5, scale=1.0):
+    """Find the cases slower than their baseline.
+
+    Parameters
+    ==========
+        results : `dict`
+            The timings returned by ``run``.
+        baseline : `dict`
+            The stored timings.
+        threshold : `float`, `optional`
+            The allowed ratio of the new to the stored minimum time.
+            Defaults to 1.5.
+        scale : `float`, `optional`
+            The factor turning stored times into times of this machine,
+            see ``calibrate``. Defaults to 1.0.
+
+    Returns
+    =======
+        dict
+            The ratio of each regressed case, new cases being ignored.
+    """
+    regressions = {}
+    for case, timing in results.items():
+        if case not in baseline:
+            continue
+        expected = baseline[case]["min"] * scale
+        ratio = timing["min"] / max(expected, 1e-12)
+        if ratio > threshold and timing["min"] - expected > NOISE_FLOOR:
+            regressions[case] = ratio
+    return regressions
+
+
+def _reference():
+    """Set up the reference workload, timing how fast this machine runs sympy."""
+    x, y = sp.symbols("x y")
+    return lambda: (sp.expand(((x + y + 1) ** 8).diff(x, 2)), sp.series(sp.tan(x), x, 0, 10))
+
+
+def machine(repeat=5):
+    """Describe this machine, with the time it takes to run the reference workload.
+
+    Parameters
+    ==========
+        repeat : `int`, `optional`
+            The number of runs of the reference workload. Defaults to 5.
+
+    Returns
+    =======
+        dict
+            The ``host``, the versions of ``python``, ``sympy`` and
+            ``numpy``, the ``platform``, the number of ``cpus``, and the
+            minimum ``reference`` seconds.
+    """
+    return {"host": platform.node(), "python": platform.python_version(),
+            "sympy": sp.__version__, "numpy": np.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count(),
+            "reference": measure(_reference, repeat)["min"]}
+
+
+def calibrate(stored, current):
+    """Get the factor turning the timings of a machine into those of another.
+
+    Timings are only comparable with the same Python and sympy versions.
+    Between hosts, they are rescaled by the time each one takes to run
+    the reference workload.
+
+    Parameters
+    ==========
+        stored : `dict`
+            The machine of the baseline, see ``machine``.
+        current : `dict`
+            The machine running the benchmarks.
+
+    Returns
+    =======
+        float
+            The factor, or None if the timings are not comparable.
+    """
+    if any(stored.get(key) != current[key] for key in ("python", "sympy")):
+        return None
+    if stored.get("host") == current["host"] or not stored.get("reference"):
+        return 1.0
+    return current["reference"] / stored["reference"]
+
+
+def load_baseline(path=BASELINE):
+    """Read the stored machine and timings, empty if there are none."""
+    if not os.path.exists(path):
+        return {}, {}
+    with open(path, encoding="utf-8") as file:
+        stored = json.load(file)
+    return stored["machine"], stored["results"]
+
+
+def save_baseline(results, path=BASELINE, description=None):
+    """Store timings with a description of the machine they come from."""
+    stored = {"machine": description or machine(), "results": results}
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(stored, file, indent=2, sort_keys=True)
+        file.write("\n")
@@ -1,13 +1,20 @@
 """Main program for DerivativeXpert."""
 
+import argparse
+import json
 import sys
-from sympy import pretty
-from basic_calculator.basic_calc import BasicCalculator
-from advanced_calc.function import Function
+from advanced_calc import metrics
+from advanced_calc.timeout import TIMEOUT
+
+# Seconds an analysis may run before it is abandoned.
+BUDGET = 60
 
 
 def basic_calculator():
     """Basic calculator function."""
+    from sympy import pretty
+    from basic_calculator.basic_calc import BasicCalculator
+
     while True:
         try:
             exp = input("Enter the exepression or 'm' to main menu: ")
@@ -18,10 +25,14 @@ def basic_calculator():
             print(f"oooopppps, {str(e)}")
             continue
         print(pretty(basic_calc.evaluate_expression()))
+        show_profile()
 
 
 def advanced_calculator():
     """Advanced calculator function."""
+    from sympy import pretty
+    from advanced_calc.function import Function
+
     fun = ""
     while True:
         if fun == "":
@@ -48,6 +59,7 @@ def advanced_calculator():
 10- Asymptotes
 11- Domain and Range
 12- Extrema
+13- Full analysis
 """
         )
         choice = input("Enter the choice or 'm' to main menu: ")
@@ -78,7 +90,7 @@ def advanced_calculator():
                 print("Invalid order, please enter correct number.")
                 continue
             try:
-                function.diffrentiate(order=order).plot()
+                function.plot(order=order)
             except ValueError as e:
                 print(str(e))
         elif choice == "5":
@@ -88,42 +100,99 @@ def advanced_calculator():
             except ValueError as e:
                 print(f"Invalid point, {str(e)}")
         elif choice == "6":
-            critical_points = function.critical_points()
-            if len(critical_points) == 0:
+            critical_points = function.critical_points(budget=BUDGET)
+            if critical_points is TIMEOUT:
+                print("Timed out finding the critical points.")
+            elif len(critical_points) == 0:
                 print("No critical points found.")
             else:
                 print("Critical points: \n")
                 print(pretty(critical_points))
         elif choice == "7":
             print("Interval of increasing and decreasing: ")
-            print(pretty(function.intervals_of_increase_decreasing()))
+            print(pretty(function.intervals_of_increase_decreasing(budget=BUDGET)))
         elif choice == "8":
-            inflection_points = function.inflection_points()
-            if inflection_points is None:
+            inflection_points = function.inflection_points(budget=BUDGET)
+            if inflection_points is TIMEOUT:
+                print("Timed out finding the inflection points.")
+            elif not inflection_points:
                 print("No inflection points found.")
             else:
                 print("Inflection points: ", inflection_points)
         elif choice == "9":
             print("Concavity: ")
-            print(pretty(function.concavity()))
+            print(pretty(function.concavity(budget=BUDGET)))
         elif choice == "10":
             print("Asymptotes: ")
-            print(pretty(function.asymptotes()))
+            print(pretty(function.asymptotes(budget=BUDGET)))
         elif choice == "11":
             print("Domain: ", pretty(function.domain))
             print("Range: ", pretty(function.range))
         elif choice == "12":
-            mx, mn = function.extrema()
+            extrema = function.extrema(budget=BUDGET)
+            if extrema is TIMEOUT:
+                print("Timed out finding the extrema.")
+                continue
+            mx, mn = extrema
             print("Maximun: ", pretty(mx))
             print("Minimum: ", pretty(mn))
+        elif choice == "13":
+            print(json.dumps(function.analyze(budget=BUDGET), indent=2))
         elif choice.lower() == "m":
             return
         else:
             print("Invalid choice, please enter correct choice.")
+        show_profile()
+
+
+def show_profile():
+    """Print and reset the time spent in each stage, when profiling."""
+    if metrics.is_enabled() and metrics.report():
+        print("\nProfile:")
+        print(metrics.format_report())
+        metrics.reset()
 
 
-def main():
+async def _serve(port, workers):
+    """Serve jobs over HTTP until interrupted."""
+    from service import aio
+
+    server = await aio.serve(port=port, service=aio.AsyncService(workers))
+    print(f"Serving DerivativeXpert on http://127.0.0.1:{port}/jobs")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
     """Main function for DerivativeXpert."""
+    parser = argparse.ArgumentParser(description="DerivativeXpert calculator")
+    parser.add_argument("--profile", action="store_true",
+                        help="print the time spent in each stage of every operation")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="run the JSON-lines jobs of FILE, or of stdin, without "
+                             "the menus, writing JSON-lines results to stdout")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes of the batch and server modes, "
+                             "0 for none in batch mode")
+    parser.add_argument("--serve", nargs="?", const=8765, type=int, metavar="PORT",
+                        help="serve the jobs of the batch mode over HTTP on localhost "
+                             "(POST /jobs), on PORT or 8765")
+    args = parser.parse_args(argv)
+    if args.profile:
+        metrics.enable()
+    if args.serve:
+        import asyncio
+
+        asyncio.run(_serve(args.serve, args.workers))
+        return
+    if args.batch:
+        from service import batch
+
+        source = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+        with source:
+            batch.run(source, sys.stdout, args.workers)
+        return
+
     print("\t\t**DerivativeXpert**\n")
 
     print(
@@ -1,7 +1,16 @@
 """A module to plot a function."""
 
-import sympy as sp
+from concurrent.futures import ProcessPoolExecutor
+import io
+import os
+import numpy as np
 from advanced_calc.function import Function
+from plot.sampling import sample, y_limits
+
+COLORS = ["blue", "red", "green", "orange", "purple", "brown", "teal"]
+
+# Figure and axes reused by every headless render of this process.
+_CANVAS = []
 
 
 class Plotter:
@@ -11,9 +20,126 @@ class Plotter:
         """Initialize the class."""
 
     @staticmethod
-    def plot(func):
+    def plot(func, interval=None, order=0):
         """Plot the function.
 
+        Parameters
+        ==========
+            func : `Function`
+                The function to plot.
+            interval : `tuple`, `optional`
+                The ``(start, end)`` window to plot, clipped to the domain
+                of the function. Defaults to (-100, 100).
+            order : `int`, `optional`
+                Also plot the derivatives up to this order on the same
+                axes. Defaults to 0.
+
+        Raises
+        ======
+            ValueError:
+                If the function is not provided.
+                If the function is not an instance of Function.
+        """
+        Plotter.check(func)
+        import matplotlib.pyplot as plt
+
+        _, axes = plt.subplots()
+        Plotter.draw(axes, func, interval, order)
+        plt.show()
+
+    @staticmethod
+    def render(func, path=None, fmt="png", interval=None, order=0):
+        """Render the function without a GUI.
+
+        The figure is drawn with the Agg canvas, and it is cleared and
+        reused by every render of the process.
+
+        Parameters
+        ==========
+            func : `Function`
+                The function to render.
+            path : `str`, `optional`
+                The file to write. Defaults to None, returning the bytes.
+            fmt : `str`, `optional`
+                The image format, "png" or "svg". Defaults to "png".
+            interval : `tuple`, `optional`
+                The ``(start, end)`` window to plot. Defaults to (-100, 100).
+            order : `int`, `optional`
+                Also plot the derivatives up to this order. Defaults to 0.
+
+        Returns
+        =======
+            str or bytes
+                The path written, or the image bytes if no path is given.
+
+        Raises
+        ======
+            ValueError:
+                If the function is not provided.
+                If the function is not an instance of Function.
+        """
+        Plotter.check(func)
+        figure, axes = _canvas()
+        axes.clear()
+        Plotter.draw(axes, func, interval, order)
+        if path:
+            figure.savefig(path, format=fmt)
+            return path
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format=fmt)
+        return buffer.getvalue()
+
+    @staticmethod
+    def render_batch(funcs, directory=None, fmt="png", interval=None,
+                     order=0, workers=None, parallel_threshold=8):
+        """Render many functions without a GUI.
+
+        Batches of at least ``parallel_threshold`` functions are rendered
+        in a process pool, each worker reusing its own figure.
+
+        Parameters
+        ==========
+            funcs : `iterable`
+                The Function objects, or expressions, to render.
+            directory : `str`, `optional`
+                The directory to write ``plot_<i>.<fmt>`` files to.
+                Defaults to None, returning the bytes of each image.
+            fmt : `str`, `optional`
+                The image format, "png" or "svg". Defaults to "png".
+            interval : `tuple`, `optional`
+                The ``(start, end)`` window to plot. Defaults to (-100, 100).
+            order : `int`, `optional`
+                Also plot the derivatives up to this order. Defaults to 0.
+            workers : `int`, `optional`
+                The number of worker processes. Defaults to the CPU count.
+            parallel_threshold : `int`, `optional`
+                The batch size from which a process pool is used.
+                Defaults to 8.
+
+        Returns
+        =======
+            list
+                The paths written, or the image bytes, in input order.
+        """
+        jobs = []
+        for i, func in enumerate(funcs):
+            if isinstance(func, Function):
+                func = func.expression
+            path = None
+            if directory:
+                path = os.path.join(directory, f"plot_{i}.{fmt}")
+            jobs.append((func, path, fmt, interval, order))
+        if len(jobs) < parallel_threshold:
+            return list(map(_render_job, jobs))
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_render_job, jobs, chunksize=chunksize))
+
+    @staticmethod
+    def check(func):
+        """Check that a function can be plotted.
+
         Parameters
         ==========
             func : `Function`
@@ -24,29 +150,86 @@ class Plotter:
             ValueError:
                 If the function is not provided.
                 If the function is not an instance of Function.
+                If the function has several variables.
         """
         if not func or not func.expression:
             raise ValueError("No function to plot.")
         if not isinstance(func, Function):
             raise ValueError("The function must be an instance of Function.")
+        if len(func.fvars) > 1:
+            raise ValueError("Only functions of one variable can be plotted.")
+
+    @staticmethod
+    def draw(axes, func, interval=None, order=0):
+        """Draw the function and its derivatives on matplotlib axes.
 
+        The derivatives are compiled jointly with the function and
+        evaluated on its sample grid in one call.
+
+        Parameters
+        ==========
+            axes : `Axes`
+                The axes to draw on.
+            func : `Function`
+                The function to draw.
+            interval : `tuple`, `optional`
+                The ``(start, end)`` window to plot. Defaults to (-100, 100).
+            order : `int`, `optional`
+                Also draw the derivatives up to this order. Defaults to 0.
+        """
         fun_str = str(func.expression)
-        x = sp.Symbol("x")
-        try:
-            symb = func.fvars[0]
-        except IndexError:
-            symb = x
-        sp.plot(
-            func.expression,
-            (symb, -100, 100),
-            title=f"Plot of $f({symb}) = {fun_str}$",
-            xlabel=f"${symb}$",
-            ylabel=f"$f({symb})$",
-            line_color="blue",
-            show=True,
-        )
+        symb = func.symbol
+        x, y = sample(func, interval)
+        curves = [y]
+        if order:
+            derivatives = func.compile(order=order)(x)[:, 1:]
+            derivatives[np.isnan(y)] = np.nan
+            curves += list(derivatives.T)
+        for i, values in enumerate(curves):
+            axes.plot(x, values, color=COLORS[i % len(COLORS)],
+                      label=f"${_prime(i)}({symb})$")
+        limits = y_limits(np.concatenate(curves))
+        if limits:
+            axes.set_ylim(*limits)
+        if order:
+            axes.legend()
+        axes.set_title(f"Plot of $f({symb}) = {fun_str}$")
+        axes.set_xlabel(f"${symb}$")
+        axes.set_ylabel(f"$f({symb})$")
+
+
+def _canvas():
+    """Get the figure and axes of this process, creating them on first use."""
+    if not _CANVAS:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        figure = Figure()
+        FigureCanvasAgg(figure)
+        _CANVAS.extend((figure, figure.add_subplot()))
+    return _CANVAS
+
+
+def _prime(order):
+    """Name of the derivative of a given order, f, f', f'', f^{(3)}, ..."""
+    if order < 3:
+        return "f" + "'" * order
+    return f"f^{{({order})}}"
+
+
+def _render_job(job):
+    """Render one function of a batch."""
+    expression, path, fmt, interval, order = job
+    return Plotter.render(Function(expression), path, fmt, interval, order)
 
 
 if __name__ == "__main__":
+    from time import perf_counter
+
     function = Function("x^2")
     Plotter.plot(function)
+
+    batch = ["x^2", "sin(x)", "ln(x)", "tan(x)", "1/x", "exp(-x^2)"] * 8
+    begin = perf_counter()
+    Plotter.render_batch(batch)
+    print(f"{len(batch) / (perf_counter() - begin):.1f} plots/second")
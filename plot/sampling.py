@@ -0,0 +1,146 @@
+"""Adaptive sampling of functions for plotting, without a GUI backend."""
+
+import numpy as np
+from advanced_calc.numeric import DEFAULT_WINDOW, window_bounds
+
+
+def sample(func, interval=None, points=200, depth=8, tolerance=1e-3):
+    """Sample a function adaptively over its domain.
+
+    The function is first evaluated on a uniform grid, restricted to the
+    part of its domain inside the interval. Segments whose midpoint
+    deviates from the straight line between their ends, or that cross
+    the edge of the domain, are then split, up to ``depth`` times, with
+    one vectorized evaluation per pass. Jumps left unresolved at the
+    finest level (singularities) are broken with a NaN point.
+
+    Parameters
+    ==========
+        func : `Function`
+            The function to sample.
+        interval : `tuple`, `optional`
+            The ``(start, end)`` window to sample. Defaults to (-100, 100).
+        points : `int`, `optional`
+            The size of the initial uniform grid. Defaults to 200.
+        depth : `int`, `optional`
+            The maximum number of refinement passes. Defaults to 8.
+        tolerance : `float`, `optional`
+            The allowed deviation from linearity, relative to the spread
+            of the values. Defaults to 1e-3.
+
+    Returns
+    =======
+        tuple
+            The sampled ``x`` and ``y`` ndarrays, NaN where the line breaks.
+    """
+    start, end = sample_bounds(func, interval)
+    if start >= end:
+        return np.array([]), np.array([])
+    x = np.linspace(start, end, points)
+    y = func.evaluate_many(x)
+    scale = _spread(y)
+    finest = (end - start) / (points - 1) / 2 ** depth
+    active = np.ones(len(x) - 1, dtype=bool)
+    for _ in range(depth):
+        active &= np.diff(x) > finest
+        if not active.any():
+            break
+        left = np.flatnonzero(active)
+        middle = (x[left] + x[left + 1]) / 2
+        y_middle = func.evaluate_many(middle)
+        split = _needs_split(y[left], y[left + 1], y_middle, tolerance * scale)
+        left, middle, y_middle = left[split], middle[split], y_middle[split]
+        x = np.insert(x, left + 1, middle)
+        y = np.insert(y, left + 1, y_middle)
+        active = np.zeros(len(x) - 1, dtype=bool)
+        new = left + np.arange(1, len(left) + 1)
+        active[new - 1] = True
+        active[new] = True
+    return _break_jumps(func, x, y, 2 * finest, scale)
+
+
+def sample_bounds(func, interval=None):
+    """Restrict a sampling window to the bounds of the domain of a function.
+
+    Gaps inside the domain are left to the NaN mask of ``evaluate_many``.
+
+    Parameters
+    ==========
+        func : `Function`
+            The function to sample.
+        interval : `tuple`, `optional`
+            The ``(start, end)`` window. Defaults to (-100, 100).
+
+    Returns
+    =======
+        tuple
+            The ``(start, end)`` floats to sample between.
+    """
+    return window_bounds(func.domain, interval or DEFAULT_WINDOW)
+
+
+def y_limits(y, margin=0.1):
+    """Pick vertical limits that ignore values blowing up near singularities.
+
+    Parameters
+    ==========
+        y : `ndarray`
+            The sampled values.
+        margin : `float`, `optional`
+            The fraction of the spread added on both sides. Defaults to 0.1.
+
+    Returns
+    =======
+        tuple
+            The ``(bottom, top)`` limits, or None if nothing is finite.
+    """
+    finite = y[np.isfinite(y)]
+    if finite.size == 0:
+        return None
+    low, high = finite.min(), finite.max()
+    clip_low, clip_high = np.percentile(finite, [2, 98])
+    if high - low > 10 * (clip_high - clip_low) > 0:
+        low, high = clip_low, clip_high
+    if high - low < 1e-12:
+        return low - 1, high + 1
+    pad = (high - low) * margin
+    return low - pad, high + pad
+
+
+def _spread(y):
+    """Robust spread of the finite values, used to scale the tolerances."""
+    finite = y[np.isfinite(y)]
+    if finite.size == 0:
+        return 1.0
+    low, high = np.percentile(finite, [5, 95])
+    return float(high - low) or 1.0
+
+
+def _needs_split(y_left, y_right, y_middle, tolerance):
+    """Decide which segments should be split at their midpoint."""
+    finite = np.isfinite([y_left, y_middle, y_right])
+    edge = finite.any(axis=0) & ~finite.all(axis=0)
+    with np.errstate(invalid="ignore"):
+        bent = np.abs(y_middle - (y_left + y_right) / 2) > tolerance
+    return edge | (finite.all(axis=0) & bent)
+
+
+def _break_jumps(func, x, y, width, scale):
+    """Insert NaN points in unresolved segments that jump across a pole.
+
+    A narrow segment with a large jump is continuous only if the value
+    at its midpoint lies strictly between the values at its ends.
+    """
+    with np.errstate(invalid="ignore"):
+        jump = (np.diff(x) <= width) & (np.abs(np.diff(y)) > scale / 4)
+    left = np.flatnonzero(jump)
+    middle = (x[left] + x[left + 1]) / 2
+    y_middle = func.evaluate_many(middle)
+    low = np.minimum(y[left], y[left + 1])
+    high = np.maximum(y[left], y[left + 1])
+    with np.errstate(invalid="ignore"):
+        pole = ~((y_middle > low) & (y_middle < high))
+    left, middle = left[pole], middle[pole]
+    x = np.insert(x, left + 1, middle)
+    y = np.insert(y, left + 1, np.nan)
+    return x, y
@@ -0,0 +1 @@
+"""Non-interactive front-ends running DerivativeXpert jobs"""
@@ -0,0 +1,271 @@
+"""Asyncio front-end running jobs in worker processes
+
+Every job runs in its own worker process, see ``await_with_budget``, so
+sympy never blocks the event loop and a cancelled job is killed::
+
+    service = AsyncService(max_concurrency=4)
+    report = await AsyncFunction("x**3 - 3*x", service).analyze()
+    value = await AsyncCalculator(service).evaluate("2^10")
+
+``serve`` exposes the same jobs over HTTP on localhost.
+"""
+
+import asyncio
+import json
+import os
+from advanced_calc.timeout import TIMEOUT, await_with_budget
+from service.jobs import BUDGET, FUNCTION_OPERATIONS, run_job
+
+
+class AsyncService:
+    """Runs jobs concurrently in worker processes, coalescing duplicates"""
+
+    def __init__(self, max_concurrency=None, budget=BUDGET):
+        """Initialize the service.
+
+        Parameters
+        ==========
+            max_concurrency : `int`, `optional`
+                The maximum number of jobs running at once, the others
+                waiting for their turn. Defaults to the CPU count.
+            budget : `float`, `optional`
+                Seconds a job that does not give its own budget may run
+                before its worker is killed. Defaults to ``BUDGET``.
+        """
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.budget = budget
+        self.executed = 0
+        self.coalesced = 0
+        self.__slots = None
+        self.__inflight = {}
+
+    async def run(self, job):
+        """Run a job, sharing the work with identical jobs in flight.
+
+        Jobs with the same expression, operation and arguments that are
+        submitted while one of them runs wait for that single execution.
+        Cancelling a caller only kills the worker once every caller
+        waiting for it has been cancelled.
+
+        Parameters
+        ==========
+            job : `dict`
+                The job, see ``service.jobs``.
+
+        Returns
+        =======
+            dict
+                The result of the job, with the ``id`` of this job.
+        """
+        if not isinstance(job, dict):
+            return run_job(job)
+        key = json.dumps({k: v for k, v in job.items() if k != "id"}, sort_keys=True,
+                         default=str)
+        if key in self.__inflight:
+            self.coalesced += 1
+            task, waiters = self.__inflight[key]
+            waiters[0] += 1
+        else:
+            task, waiters = asyncio.ensure_future(self.__execute(job)), [1]
+            self.__inflight[key] = (task, waiters)
+            task.add_done_callback(lambda _: self.__inflight.pop(key, None))
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            waiters[0] -= 1
+            if waiters[0] == 0:
+                task.cancel()
+            raise
+        return {**result, "id": job.get("id")}
+
+    async def __execute(self, job):
+        """Run a job in a worker process once a slot is free."""
+        if self.__slots is None:
+            self.__slots = asyncio.Semaphore(self.max_concurrency)
+        budget = job.get("budget", self.budget)
+        async with self.__slots:
+            self.executed += 1
+            result = await await_with_budget(run_job, budget, {**job, "budget": None})
+        if result is TIMEOUT:
+            return {"id": None, "operation": job.get("operation"), "result": None,
+                    "error": "Timed out", "seconds": budget}
+        return result
+
+
+def _unwrap(result):
+    """Get the value of a result, raising its error."""
+    if result["error"]:
+        raise ValueError(result["error"])
+    return result["result"]
+
+
+class AsyncFunction:
+    """Asynchronous counterpart of Function, one coroutine per operation
+
+    Every operation of ``service.jobs.FUNCTION_OPERATIONS`` is available as
+    a coroutine method taking the keyword arguments of the operation and
+    returning its JSON serializable result.
+    """
+
+    def __init__(self, expression, service=None):
+        """Initialize the function.
+
+        Parameters
+        ==========
+            expression : `str`
+                The expression of the function.
+            service : `AsyncService`, `optional`
+                The service running the operations. Defaults to a new one.
+        """
+        self.expression = expression
+        self.service = service or AsyncService()
+
+    def __getattr__(self, name):
+        """Get the coroutine method of an operation.
+
+        Raises
+        ======
+            AttributeError
+                If there is no such operation.
+        """
+        if name not in FUNCTION_OPERATIONS:
+            raise AttributeError(name)
+
+        async def operation(**arguments):
+            return _unwrap(await self.service.run(
+                {"expression": self.expression, "operation": name, "arguments": arguments}))
+
+        return operation
+
+
+class AsyncCalculator:
+    """Asynchronous counterpart of BasicCalculator"""
+
+    def __init__(self, service=None):
+        """Initialize the calculator.
+
+        Parameters
+        ==========
+            service : `AsyncService`, `optional`
+                The service running the evaluations. Defaults to a new one.
+        """
+        self.service = service or AsyncService()
+
+    async def evaluate(self, expression, exact=False, precision=15):
+        """Evaluate an expression without variables.
+
+        Parameters
+        ==========
+            expression : `str`
+                The expression to evaluate.
+            exact : `bool`, `optional`
+                Simplify before evaluating. Defaults to False.
+            precision : `int`, `optional`
+                The significant digits of evalf. Defaults to 15.
+
+        Returns
+        =======
+            float
+                The value, rounded to three decimals.
+
+        Raises
+        ======
+            ValueError
+                If the expression is invalid.
+        """
+        return _unwrap(await self.service.run(
+            {"expression": expression, "operation": "calculate",
+             "arguments": {"exact": exact, "precision": precision}}))
+
+
+async def serve(host="127.0.0.1", port=8765, service=None):
+    """Serve jobs over HTTP until cancelled.
+
+    ``POST /jobs`` takes one JSON job as body and answers its JSON result.
+    ``GET /health`` answers the counters of the service. Connections are
+    kept alive between requests.
+
+    Parameters
+    ==========
+        host : `str`, `optional`
+            The address to listen on. Defaults to localhost.
+        port : `int`, `optional`
+            The port to listen on, 0 for any free one. Defaults to 8765.
+        service : `AsyncService`, `optional`
+            The service running the jobs. Defaults to a new one.
+
+    Returns
+    =======
+        Server
+            The started asyncio server.
+    """
+    service = service or AsyncService()
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError as exc:  # Including UnicodeDecodeError
+                    await _send(writer, "400 Bad Request", {"error": f"Malformed request: {exc}"})
+                    break
+                if request is None:
+                    break
+                await _send(writer, *await _respond(service, *request))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def _read_request(reader):
+    """Read the method, path and body of one request, None at the end.
+
+    Raises
+    ======
+        ValueError
+            If the request line or a header is malformed.
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    words = line.decode().split()
+    if len(words) < 2:
+        raise ValueError(f"Invalid request line {line!r}")
+    method, path = words[:2]
+    length = 0
+    while True:
+        header = (await reader.readline()).decode().strip()
+        if not header:
+            break
+        name, _, value = header.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+            if length < 0:
+                raise ValueError(f"Invalid Content-Length {length}")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, body
+
+
+async def _send(writer, status, body):
+    """Write a response with a JSON body."""
+    payload = json.dumps(body).encode()
+    writer.write(
+        f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+    await writer.drain()
+
+
+async def _respond(service, method, path, body):
+    """Get the status and JSON body answering a request."""
+    if method == "GET" and path == "/health":
+        return "200 OK", {"executed": service.executed, "coalesced": service.coalesced}
+    if method == "POST" and path == "/jobs":
+        try:
+            job = json.loads(body)
+        except ValueError as exc:  # JSONDecodeError or UnicodeDecodeError
+            return "400 Bad Request", {"error": f"Invalid JSON: {exc}"}
+        return "200 OK", await service.run(job)
+    return "404 Not Found", {"error": f"No route for {method} {path}"}
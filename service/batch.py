@@ -0,0 +1,93 @@
+"""Streaming of JSON-lines jobs through a process pool"""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import json
+import os
+from service.jobs import run_job
+
+
+def read_jobs(lines):
+    """Parse JSON-lines jobs lazily.
+
+    Blank lines are skipped. A line that is not valid JSON becomes a job
+    without expression, reported as an error with the line number as id.
+
+    Parameters
+    ==========
+        lines : `iterable`
+            The lines, such as an open file or ``sys.stdin``.
+
+    Yields
+    ======
+        dict
+            One job per line.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield {"id": number, "operation": None, "json_error": str(exc)}
+
+
+def stream(jobs, workers=None, window=None):
+    """Run jobs in a process pool, yielding results as they complete.
+
+    At most ``window`` jobs are read ahead of the results, so memory
+    stays bounded whatever the number of jobs. Results come in the order
+    they complete; their ``id`` tells which job they belong to.
+
+    Parameters
+    ==========
+        jobs : `iterable`
+            The jobs, see ``service.jobs``.
+        workers : `int`, `optional`
+            The number of worker processes, 0 running the jobs one after
+            the other in this process. Defaults to the CPU count.
+        window : `int`, `optional`
+            The maximum number of jobs in flight.
+            Defaults to four per worker.
+
+    Yields
+    ======
+        dict
+            The result of each job.
+    """
+    if workers == 0:
+        yield from map(run_job, jobs)
+        return
+    workers = workers or os.cpu_count() or 1
+    window = window or 4 * workers
+    jobs = iter(jobs)
+    end = object()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < window:
+                job = next(jobs, end)
+                if job is end:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(run_job, job))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def run(source, output, workers=None):
+    """Run the JSON-lines jobs of a file and write the results to another.
+
+    Parameters
+    ==========
+        source : `file`
+            The jobs, one JSON object per line.
+        output : `file`
+            Receives one JSON result per line, flushed as they complete.
+        workers : `int`, `optional`
+            The number of worker processes. Defaults to the CPU count.
+    """
+    for result in stream(read_jobs(source), workers):
+        output.write(json.dumps(result) + "\n")
+        output.flush()
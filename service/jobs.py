@@ -0,0 +1,119 @@
+"""Jobs: one operation on one expression, described by a JSON object
+
+A job looks like::
+
+    {"id": 7, "expression": "x**2 - 1", "operation": "critical_points",
+     "arguments": {"interval": [0, 5]}, "budget": 10}
+
+and its result like::
+
+    {"id": 7, "operation": "critical_points", "result": [0], "error": null,
+     "seconds": 0.12}
+"""
+
+import time
+from advanced_calc.function import Function, serializable
+from advanced_calc.timeout import TIMEOUT, run_with_budget
+from basic_calculator.basic_calc import BasicCalculator
+
+# Seconds a job may run, unless it gives its own budget.
+BUDGET = 60
+
+
+def _calculate(expression, exact=False, precision=15):
+    """Evaluate an expression without variables."""
+    return BasicCalculator(expression, exact=exact, precision=precision).evaluate_expression()
+
+
+def _diffrentiate(function, order=1):
+    """Differentiate a function, giving the derivative expression."""
+    return function.diffrentiate(order=order).expression
+
+
+def _attribute(name):
+    """Read an attribute of a function."""
+    return lambda function: getattr(function, name)
+
+
+def _method(name):
+    """Call a method of a function."""
+    return lambda function, **arguments: getattr(function, name)(**arguments)
+
+
+# Operations on a Function, by name.
+FUNCTION_OPERATIONS = {
+    "domain": _attribute("domain"),
+    "range": _attribute("range"),
+    "evaluate": _method("evaluate"),
+    "slope": _method("slope"),
+    "diffrentiate": _diffrentiate,
+    "critical_points": _method("critical_points"),
+    "intervals_of_increase_decreasing": _method("intervals_of_increase_decreasing"),
+    "inflection_points": _method("inflection_points"),
+    "concavity": _method("concavity"),
+    "asymptotes": _method("asymptotes"),
+    "extrema": _method("extrema"),
+    "gradient": _method("gradient"),
+    "hessian": _method("hessian"),
+    "analyze": _method("analyze"),
+}
+
+# Every operation, the basic calculator one taking the expression itself.
+OPERATIONS = sorted([*FUNCTION_OPERATIONS, "calculate"])
+
+
+def _operate(operation, expression, arguments):
+    """Run an operation on an expression."""
+    if operation == "calculate":
+        return _calculate(expression, **arguments)
+    return FUNCTION_OPERATIONS[operation](Function(expression), **arguments)
+
+
+def run_job(job, budget=BUDGET):
+    """Run a job and describe its outcome.
+
+    The operation runs in a worker process killed after the budget of
+    the job, see ``run_with_budget``. Errors, such as an invalid
+    expression, an unknown operation or a timeout, are reported in the
+    result instead of being raised.
+
+    Parameters
+    ==========
+        job : `dict`
+            The ``expression``, the ``operation`` and its keyword
+            ``arguments``, an ``id`` copied to the result, and the
+            ``budget`` in seconds, None meaning no limit.
+        budget : `float`, `optional`
+            The budget of the jobs that do not give one.
+            Defaults to ``BUDGET``.
+
+    Returns
+    =======
+        dict
+            The ``id``, ``operation``, JSON serializable ``result``, the
+            ``error`` message or None, and the ``seconds`` it took.
+    """
+    start = time.perf_counter()
+    result, error = None, None
+    operation = job.get("operation", "analyze") if isinstance(job, dict) else None
+    try:
+        if isinstance(job, dict) and "json_error" in job:
+            raise ValueError(f"Invalid JSON: {job['json_error']}")
+        if not isinstance(job, dict) or "expression" not in job:
+            raise ValueError("A job must be an object with an expression")
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation {operation!r}, expected one of {OPERATIONS}")
+        result = run_with_budget(
+            _operate, job.get("budget", budget), operation, job["expression"],
+            job.get("arguments") or {})
+        if result is TIMEOUT:
+            result, error = None, "Timed out"
+    except Exception as exc:  # pylint: disable=broad-except
+        error = f"{type(exc).__name__}: {exc}"
+    return {
+        "id": job.get("id") if isinstance(job, dict) else None,
+        "operation": operation,
+        "result": serializable(result),
+        "error": error,
+        "seconds": time.perf_counter() - start,
+    }
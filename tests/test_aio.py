@@ -0,0 +1,89 @@
+"""Test the asyncio front-end of the DerivativeXpert package."""
+
+import asyncio
+import json
+import time
+import unittest
+from service.aio import AsyncCalculator, AsyncFunction, AsyncService, serve
+
+
+class TestAsyncService(unittest.TestCase):
+    """Test cases for the asyncio front-end."""
+
+    def test_operations(self):
+        """Test the coroutine methods and the coalescing of duplicates."""
+        async def scenario():
+            service = AsyncService(max_concurrency=2)
+            function = AsyncFunction("x**3 - 3*x", service)
+            points = await asyncio.gather(*[function.critical_points() for _ in range(4)])
+            self.assertEqual(points, [[-1, 1]] * 4)
+            self.assertEqual((service.executed, service.coalesced), (1, 3))
+            self.assertEqual(await AsyncCalculator(service).evaluate("2^10"), 1024)
+            with self.assertRaises(ValueError):
+                await AsyncCalculator(service).evaluate("x +* 1")
+            with self.assertRaises(AttributeError):
+                function.integrate  # pylint: disable=pointless-statement
+
+        asyncio.run(scenario())
+
+    def test_cancellation(self):
+        """Test that a cancelled job does not hold its slot."""
+        async def scenario():
+            service = AsyncService(max_concurrency=1)
+            slow = asyncio.ensure_future(
+                AsyncFunction("x**x*sin(x)/(x - 1)", service).analyze())
+            await asyncio.sleep(0.2)
+            slow.cancel()
+            start = time.perf_counter()
+            self.assertEqual(await AsyncCalculator(service).evaluate("1 + 1"), 2)
+            self.assertLess(time.perf_counter() - start, 5)
+            self.assertTrue(slow.cancelled())
+
+        asyncio.run(scenario())
+
+    def test_server(self):
+        """Test the HTTP server on localhost."""
+        async def request(port, method, path, body=b""):
+            return await exchange(
+                port, f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n"
+                .encode() + body)
+
+        async def exchange(port, data):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(data)
+            await writer.drain()
+            status = (await reader.readline()).decode()
+            length = 0
+            while (header := (await reader.readline()).decode().strip()):
+                if header.lower().startswith("content-length"):
+                    length = int(header.split(":")[1])
+            payload = json.loads(await reader.readexactly(length))
+            writer.close()
+            return status.split()[1], payload
+
+        async def scenario():
+            server = await serve(port=0, service=AsyncService(max_concurrency=2))
+            port = server.sockets[0].getsockname()[1]
+            job = json.dumps({"id": 3, "expression": "x**2", "operation": "diffrentiate"})
+            status, result = await request(port, "POST", "/jobs", job.encode())
+            self.assertEqual((status, result["id"], result["result"]), ("200", 3, "2*x"))
+            status, health = await request(port, "GET", "/health")
+            self.assertEqual((status, health["executed"]), ("200", 1))
+            status, _ = await request(port, "GET", "/nothing")
+            self.assertEqual(status, "404")
+            for malformed in (b"GARBAGE\r\n\r\n", b"\xff\xfe /jobs HTTP/1.1\r\n\r\n",
+                              b"POST /jobs HTTP/1.1\r\nContent-Length: ten\r\n\r\n",
+                              b"POST /jobs HTTP/1.1\r\nContent-Length: -1\r\n\r\n"):
+                status, error = await exchange(port, malformed)
+                self.assertEqual(status, "400")
+                self.assertTrue(error["error"].startswith("Malformed request"))
+            status, error = await request(port, "POST", "/jobs", b"\xff\xfe\xff")
+            self.assertEqual((status, error["error"][:12]), ("400", "Invalid JSON"))
+            server.close()
+            await server.wait_closed()
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 """Test BasicCalculator for the DerivativeXpert package."""
 
 import unittest
+from unittest.mock import patch
 from basic_calculator.basic_calc import BasicCalculator
 from sympy import log, sqrt, E, pi, sin, cos, tan, sinh, asec,ln, sympify, simplify
 from pycodestyle import Checker
@@ -57,6 +58,35 @@ class TestBasicCalculator(unittest.TestCase):
         basic_calc = BasicCalculator("3^2")
         self.assertAlmostEqual(basic_calc.evaluate_expression(), 9.000, places=3)
 
+    def test_modes(self):
+        """Test the fast and exact evaluation modes."""
+        expr = "sin(pi)+cos(pi)+tan(pi/4)+asec(1)-sinh(pi)"
+        fast = BasicCalculator(expr)
+        exact = BasicCalculator(expr, exact=True)
+        self.assertEqual(fast.evaluate_expression(), exact.evaluate_expression())
+        self.assertEqual(fast.expression, exact.expression)
+        self.assertAlmostEqual(
+            BasicCalculator("pi", precision=3).evaluate_expression(), 3.14, places=2)
+
+    def test_evaluate_batch(self):
+        """Test the evaluate_batch method."""
+        expressions = ["1+1", "ln(E**2)", "x+1", "1 + 1", "sqrt(-1)", "3^2"]
+        for parallel_threshold in (256, 1):
+            results = list(BasicCalculator.evaluate_batch(
+                expressions, workers=2, parallel_threshold=parallel_threshold))
+            self.assertEqual(results[:2] + results[3:4] + results[5:], [2.0, 2.0, 2.0, 9.0])
+            self.assertIsInstance(results[2], ValueError)
+            self.assertIsInstance(results[4], ValueError)
+        with patch("basic_calculator.basic_calc._evaluate",
+                   side_effect=lambda expression: expression):
+            self.assertEqual(
+                list(BasicCalculator.evaluate_batch(iter(["2 + 2*sqrt(2)", " 2 +  2*sqrt(2)"]))),
+                ["2 + 2*sqrt(2)"] * 2)
+        batch = BasicCalculator.evaluate_batch(
+            [f"{n}^2" for n in range(64)], workers=1, parallel_threshold=1)
+        self.assertEqual(next(batch), 0.0)
+        batch.close()
+
 # python -m unittest tests/test_basic_calc.py
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""Test the batch mode of the DerivativeXpert package."""
+
+import io
+import json
+import unittest
+from service.batch import read_jobs, run, stream
+from service.jobs import run_job
+
+
+class TestBatch(unittest.TestCase):
+    """Test cases for the JSON-lines jobs."""
+
+    def test_run_job(self):
+        """Test the operations and the reported errors."""
+        result = run_job({"id": "a", "expression": "x**3 - 3*x",
+                          "operation": "critical_points"})
+        self.assertEqual((result["id"], result["result"], result["error"]), ("a", [-1, 1], None))
+        result = run_job({"expression": "x**2", "operation": "diffrentiate",
+                          "arguments": {"order": 1}})
+        self.assertEqual(result["result"], "2*x")
+        result = run_job({"expression": "2^10", "operation": "calculate"})
+        self.assertEqual(result["result"], 1024)
+        result = run_job({"expression": "x", "operation": "integrate"})
+        self.assertTrue(result["error"].startswith("ValueError: Unknown operation"))
+        result = run_job({"expression": "x +* 1", "operation": "domain"})
+        self.assertIsNone(result["result"])
+        self.assertIsNotNone(result["error"])
+
+    def test_job_budget(self):
+        """Test that a slow job is stopped after its budget."""
+        job = {"expression": "tan(x)", "operation": "diffrentiate",
+               "arguments": {"order": 25}, "budget": 0.5}
+        result = run_job(job)
+        self.assertEqual((result["result"], result["error"]), (None, "Timed out"))
+        self.assertLess(result["seconds"], 5)
+        del job["budget"]
+        self.assertEqual(run_job(job, budget=0.5)["error"], "Timed out")
+
+    def test_stream(self):
+        """Test that every job gets one result, with or without workers."""
+        lines = [json.dumps({"id": i, "expression": f"x**{i}", "operation": "evaluate",
+                             "arguments": {"value": 2}}) for i in range(6)]
+        lines += ["", "{not json"]
+        for workers in (0, 2):
+            results = {r["id"]: r for r in stream(read_jobs(lines), workers, window=3)}
+            self.assertEqual(sorted(results), list(range(6)) + [8])
+            self.assertEqual(results[5]["result"], 32)
+            self.assertTrue(results[8]["error"].startswith("ValueError: Invalid JSON"))
+        output = io.StringIO()
+        run(io.StringIO("\n".join(lines[:2])), output, workers=0)
+        self.assertEqual(len(output.getvalue().splitlines()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
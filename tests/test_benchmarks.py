@@ -0,0 +1,38 @@
+"""Test the benchmark suite of the DerivativeXpert package."""
+
+import unittest
+from benchmarks.suite import BENCHMARKS, calibrate, compare, machine, measure, run
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Test cases for the benchmark suite."""
+
+    def test_compare(self):
+        """Test that only slow cases above the noise floor regress."""
+        baseline = {"a": {"min": 0.1}, "b": {"min": 0.1}, "c": {"min": 1e-5}}
+        results = {"a": {"min": 0.2}, "b": {"min": 0.12}, "c": {"min": 1e-4},
+                   "d": {"min": 9.0}}
+        self.assertEqual(compare(results, baseline, threshold=1.5), {"a": 2.0})
+        self.assertEqual(compare(results, baseline, threshold=1.5, scale=2.0), {})
+
+    def test_calibrate(self):
+        """Test that baselines of other machines are rescaled or not compared."""
+        current = machine(repeat=1)
+        self.assertGreater(current["reference"], 0)
+        self.assertEqual(calibrate(current, current), 1.0)
+        other = {**current, "host": "other", "reference": current["reference"] / 2}
+        self.assertAlmostEqual(calibrate(other, current), 2.0)
+        self.assertIsNone(calibrate({**other, "python": "2.7.18"}, current))
+        self.assertIsNone(calibrate({**current, "sympy": "0.7"}, current))
+
+    def test_run(self):
+        """Test one benchmark over its corpus."""
+        timing = measure(lambda: (lambda: None), repeat=2)
+        self.assertLessEqual(timing["min"], timing["median"])
+        results = run(["evaluate_many"], repeat=1)
+        self.assertEqual(len(results), len(BENCHMARKS["evaluate_many"][1]))
+        self.assertTrue(all(case.startswith("evaluate_many[") for case in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""Test the caches of the DerivativeXpert package."""
+
+from contextlib import closing
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+import sympy as sp
+from sympy.abc import x
+from advanced_calc.cache import (
+    LIMIT_CACHE, LRUCache, PersistentCache, cached_limits,
+    disable_persistent_cache, enable_persistent_cache)
+from advanced_calc.function import Function
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test cases for the LRUCache class."""
+
+    def test_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get("b", "missing"), "missing")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.info(), {"hits": 1, "misses": 1, "size": 2, "maxsize": 2})
+        cache.clear()
+        self.assertEqual(cache.info()["size"], 0)
+
+    def test_cached_limits(self):
+        """Test that limits are computed once and failures are not cached."""
+        LIMIT_CACHE.clear()
+        requests = [(1 / x, x, 0, "-"), (1 / x, x, 0, "+"), (sp.sin(x) / x, x, 0, "+")]
+        self.assertEqual(cached_limits(requests, 30), [-sp.oo, sp.oo, 1])
+        self.assertEqual(cached_limits(requests[:2]), [-sp.oo, sp.oo])
+        self.assertEqual(LIMIT_CACHE.info()["hits"], 2)
+        self.assertEqual(cached_limits([(x, x, 0, "up")], 30), [None])
+        self.assertEqual(len(LIMIT_CACHE), 3)
+
+
+class TestPersistentCache(unittest.TestCase):
+    """Test cases for the PersistentCache class."""
+
+    def setUp(self):
+        """Create a temporary cache file."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.db")
+
+    def tearDown(self):
+        """Disable the cache and remove the file."""
+        disable_persistent_cache()
+        self.directory.cleanup()
+
+    def test_eviction_and_version(self):
+        """Test the eviction and the invalidation of old versions."""
+        cache = PersistentCache(self.path, maxsize=2)
+        cache.put("a", "op", sp.Interval(0, 1))
+        cache.put("b", "op", [1, 2])
+        self.assertEqual(cache.get("a", "op"), sp.Interval(0, 1))
+        cache.put("c", "op", 3)
+        self.assertEqual(cache.get("b", "op", "missing"), "missing")
+        self.assertEqual(cache.info(), {"hits": 1, "misses": 1, "size": 2, "maxsize": 2})
+        self.assertEqual(len(PersistentCache(self.path)), 2)
+        PersistentCache.VERSION += 1
+        try:
+            self.assertEqual(len(PersistentCache(self.path)), 0)
+        finally:
+            PersistentCache.VERSION -= 1
+
+    def test_batched_reads(self):
+        """Test that reads mark entries as used in batches, not one by one."""
+        cache = PersistentCache(self.path, maxsize=3)
+        cache.put("a", "op", 1)
+
+        def used():
+            with closing(sqlite3.connect(self.path)) as connection:
+                return connection.execute("SELECT used FROM entries").fetchone()[0]
+
+        written = used()
+        self.assertEqual(cache.get("a", "op"), 1)
+        self.assertEqual(used(), written)
+        cache.close()
+        self.assertGreater(used(), written)
+        for key in "bcde":
+            cache.put(key, "op", 2)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.get("a", "op"), None)
+
+    def test_function_analyses(self):
+        """Test that Function reuses results stored by another instance."""
+        cache = enable_persistent_cache(self.path)
+        self.assertEqual(Function("x**3 - 3*x").critical_points(), [-1, 1])
+        self.assertEqual(cache.info()["hits"], 0)
+        stored = len(cache)
+        self.assertGreater(stored, 0)
+        function = Function("x**3 - 3*x")
+        self.assertEqual(function.critical_points(), [-1, 1])
+        self.assertEqual(function.domain, sp.S.Reals)
+        self.assertEqual(len(cache), stored)
+        self.assertGreater(cache.info()["hits"], 0)
+
+    def test_approximate_analyses(self):
+        """Test that fallbacks found after a timeout are not stored."""
+        from advanced_calc import function as module
+
+        enable_persistent_cache(self.path)
+        solve = module._solve_critical_points
+
+        def slow(*args):
+            time.sleep(1)
+            return solve(*args)
+
+        function = Function("x**3 - 2*x")
+        function.analysis_timeout = 0.2
+        with mock.patch.object(module, "_solve_critical_points", slow):
+            approximate = function.critical_points()
+        self.assertAlmostEqual(approximate[1], 0.8165, places=4)
+
+        def stored():
+            with closing(sqlite3.connect(self.path)) as connection:
+                operations = connection.execute("SELECT operation FROM entries").fetchall()
+            return [operation for operation, in operations
+                    if operation.startswith("critical_points(")]
+
+        self.assertEqual(stored(), [])
+        function.value.forget()
+        self.assertEqual(Function("x**3 - 2*x").critical_points(),
+                         [-sp.sqrt(6) / 3, sp.sqrt(6) / 3])
+        self.assertEqual(len(stored()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Test the canonical forms of the DerivativeXpert package."""
+
+import unittest
+import sympy as sp
+from sympy.abc import x
+from sympy.calculus.util import continuous_domain
+from advanced_calc.canonical import canonical, canonical_key
+from advanced_calc.function import Function
+from basic_calculator.basic_calc import BasicCalculator
+
+
+class TestCanonical(unittest.TestCase):
+    """Test cases for the canonicalization."""
+
+    def test_equivalent(self):
+        """Test that equivalent inputs share one canonical form."""
+        forms = [canonical(e) for e in ("x^2+3*x", "3*x + x**2", "x*(x+3)", x * (x + 3))]
+        self.assertEqual(forms[0], x**2 + 3*x)
+        self.assertTrue(all(form is forms[0] for form in forms))
+        self.assertEqual(canonical_key("x*(x+3)"), sp.srepr(x**2 + 3*x))
+        self.assertEqual(canonical("(x + 1)**20"), (x + 1)**20)
+
+    def test_domain(self):
+        """Test that no form changes the domain of the expression."""
+        for expression in ("x*(1/x + 1)", "tan(x)*(1/tan(x) + 1)", "(x**2 - 1)/(x - 1)"):
+            for simplify in (False, True):
+                form = canonical(expression, simplify=simplify)
+                self.assertEqual(sp.simplify(form - sp.sympify(expression)), 0)
+                self.assertEqual(str(continuous_domain(form, x, sp.Reals)),
+                                 str(continuous_domain(sp.sympify(expression), x, sp.Reals)))
+        self.assertEqual(canonical("sin(x)**2 + cos(x)**2 + x", simplify=True), x + 1)
+
+    def test_shared(self):
+        """Test that equivalent functions and batches share their work."""
+        first, second = Function("x*(x - 3)"), Function("x**2 - 3*x")
+        self.assertIs(first.value, second.value)
+        self.assertIs(first.critical_points(), second.critical_points())
+        self.assertEqual(first.diffrentiate().expression, 2*x - 3)
+        self.assertEqual(list(BasicCalculator.evaluate_batch(
+            ["2*(1 + sqrt(2))", "2 + 2*sqrt(2)", "1 +* 2"]))[:2], [4.828, 4.828])
+
+
+if __name__ == "__main__":
+    unittest.main()
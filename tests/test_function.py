@@ -1,11 +1,14 @@
 """Test functions for the DerivativeXpert package."""
 
+import json
 import unittest
 from advanced_calc.function import Function
+from advanced_calc.cache import DERIVATIVE_CACHE
 from sympy.abc import x, y
 from sympy import log, sqrt, E, pi, sin, cos, tan, sinh, asec, sympify, simplify, exp
 from pycodestyle import Checker
 import sympy as sp
+import numpy as np
 
 
 class TestFunction(unittest.TestCase):
@@ -59,10 +62,13 @@ class TestFunction(unittest.TestCase):
         function = Function("sin(x)+cos(x)+tan(pi/4)+asec(1)-sinh(x)")
         self.assertEqual(function.fvars, [x])
 
+        function = Function("x**y")
+        self.assertEqual(function.fvars, [x, y])
+        function = Function("ln(y)+5*ln(x)")
+        self.assertEqual(function.fvars, [x, y])
+
         with self.assertRaises(ValueError):
-            function = Function("x**y")
             function = Function("3llam+fawzy-farg")
-            function = Function("ln(x)+5*ln(y)")
 
     def test_evaluation(self):
         """Test the evaluate method."""
@@ -80,6 +86,89 @@ class TestFunction(unittest.TestCase):
         function = Function("sin(x)+cos(x)+tan(pi/4)+asec(1)-sinh(x)")
         self.assertAlmostEqual(function.evaluate(pi), -11.549, places=3)
 
+    def test_domain_range(self):
+        """Test the lazily computed domain and range."""
+        function = Function("ln(x)")
+        self.assertEqual(function.domain, sp.Interval.open(0, sp.oo))
+        self.assertEqual(function.range, sp.S.Reals)
+        function = Function("x**2")
+        self.assertEqual(function.range, sp.Interval(0, sp.oo))
+        function.domain = sp.Interval(0, 1)
+        self.assertEqual(function.domain, sp.Interval(0, 1))
+        function = Function("sin(x)+cos(x)-sinh(x)")
+        self.assertEqual(function.range, sp.S.Reals)
+
+    def test_evaluate_many(self):
+        """Test the vectorized evaluate_many method."""
+        function = Function("ln(x)+5*ln(x)-sqrt(x)/E^x")
+        values = function.evaluate_many([7, 1, -1, 0])
+        self.assertAlmostEqual(values[0], 11.673, places=3)
+        self.assertAlmostEqual(values[1], -1 / float(E), places=6)
+        self.assertTrue(np.isnan(values[2]) and np.isnan(values[3]))
+        function = Function("2")
+        self.assertEqual(list(function.evaluate_many([1, 2])), [2.0, 2.0])
+        function = Function("tan(x)")
+        values = function.evaluate_many([0, float(pi / 2), float(3 * pi / 2)])
+        self.assertEqual(values[0], 0.0)
+        self.assertTrue(np.isnan(values[1:]).all())
+        function = Function("1/x")
+        self.assertEqual(function.evaluate_many(np.ones((2, 2))).shape, (2, 2))
+
+    def test_compile(self):
+        """Test the joint compilation of the derivative tower."""
+        function = Function("x**5*sin(x)")
+        compiled = function.compile(order=3)
+        values = np.array([0.5, 1.0, 2.0])
+        result = compiled(values)
+        self.assertEqual(result.shape, (3, 4))
+        for n, derivative in enumerate(function.derivative_tower(order=3), start=1):
+            np.testing.assert_allclose(result[:, n], derivative.evaluate_many(values))
+        np.testing.assert_allclose(result[:, 0], function.evaluate_many(values))
+        self.assertTrue(np.isnan(Function("ln(x)").compile(order=1)([-1.0])).all())
+
+    def test_diffrentiate(self):
+        """Test the diffrentiate and derivative_tower methods."""
+        function = Function("x^5")
+        self.assertEqual(function.diffrentiate().expression, 5 * x**4)
+        self.assertEqual(function.diffrentiate(order=4).expression, 120 * x)
+        self.assertEqual(function.diffrentiate(order=20).expression, 0)
+        self.assertEqual(
+            [d.expression for d in function.derivative_tower(order=3)],
+            [5 * x**4, 20 * x**3, 60 * x**2],
+        )
+        self.assertEqual(Function("2").diffrentiate(order=2).expression, 0)
+
+    def test_derivative_cache(self):
+        """Test that derivatives are computed once and shared."""
+        DERIVATIVE_CACHE.clear()
+        function = Function("x**3 - 3*x")
+        derivative = function.diffrentiate()
+        self.assertIs(function.diffrentiate(), derivative)
+        self.assertIs(Function("x**3 - 3*x").diffrentiate(), derivative)
+        self.assertEqual(DERIVATIVE_CACHE.info()["hits"], 1)
+        self.assertEqual(function.slope(2), 9)
+        tower = function.derivative_tower(order=3)
+        self.assertIs(tower[0], derivative)
+        self.assertIs(function.diffrentiate(order=3), tower[2])
+
+    def test_gradient_hessian(self):
+        """Test the partial derivatives of functions of several variables."""
+        function = Function("x**2*y + sin(y)")
+        self.assertEqual(function.partial_derivative("y").expression, x**2 + cos(y))
+        self.assertEqual(function.gradient(), sp.Matrix([2*x*y, x**2 + cos(y)]))
+        self.assertEqual(function.hessian(), sp.Matrix([[2*y, 2*x], [2*x, -sin(y)]]))
+        points = np.array([[1.0, 0.0], [2.0, 1.0], [-1.0, 3.0]])
+        np.testing.assert_allclose(function.evaluate_many(points), [0, 4 + np.sin(1), 3 + np.sin(3)])
+        np.testing.assert_allclose(
+            function.evaluate_gradient(points),
+            [[0, 2], [4, 4 + np.cos(1)], [-6, 1 + np.cos(3)]])
+        np.testing.assert_allclose(
+            function.evaluate_hessian(points)[1], [[2, 4], [4, -np.sin(1)]])
+        with self.assertRaises(ValueError):
+            function.evaluate_gradient([1.0, 2.0, 3.0])
+        np.testing.assert_allclose(
+            Function("x**3").evaluate_gradient([1, 2])[:, 0], [3, 12])
+
     def test_slope(self):
         """Test the slope method."""
 
@@ -141,6 +230,19 @@ class TestFunction(unittest.TestCase):
         function = Function("log(x)")
         self.assertEqual(function.critical_points(), None)
 
+    def test_numeric_critical_points(self):
+        """Test the numeric fallback of the critical_points method."""
+        points = Function("sin(x)").critical_points()
+        self.assertEqual(len(points), 64)
+        self.assertEqual(points, sorted(points))
+        for point in points:
+            self.assertAlmostEqual(np.cos(point), 0, places=9)
+        points = Function("cos(x) + x**2/10").critical_points(interval=[-10, 10])
+        self.assertEqual(len(points), 3)
+        self.assertEqual(points[1], 0.0)
+        self.assertAlmostEqual(points[2], 2.595739, places=6)
+        self.assertAlmostEqual(points[0], -points[2], places=12)
+
     def test_extrema(self):
         """Test the extrema method."""
 
@@ -165,6 +267,103 @@ class TestFunction(unittest.TestCase):
         function = Function("log(x)")
         self.assertEqual(function.extrema(interval=[1, sp.exp(1)]), (0.0, 1.0))
 
+    def test_monotonicity_and_concavity(self):
+        """Test the sign tables of the first and second derivatives."""
+        function = Function("x**3 - 3*x")
+        self.assertEqual(function.intervals_of_increase_decreasing(), {
+            "Constant": [],
+            "Increasing": [[-sp.oo, -1], [1, sp.oo]],
+            "Decreasing": [[-1, 1]],
+        })
+        self.assertEqual(function.concavity(), {
+            "Linear": [], "Concave Up": [[0, sp.oo]], "Concave Down": [[-sp.oo, 0]]})
+        function = Function("1/x")
+        self.assertEqual(
+            function.intervals_of_increase_decreasing()["Decreasing"],
+            [[-sp.oo, 0], [0, sp.oo]])
+        function = Function("x**4 - 4*x**3 + 6*x**2")
+        self.assertEqual(function.concavity()["Concave Up"], [[-sp.oo, sp.oo]])
+        function = Function("sin(x)")
+        self.assertEqual(
+            function.intervals_of_increase_decreasing(interval=[0, 6]),
+            {"Constant": [], "Increasing": [[0, pi / 2], [3 * pi / 2, 6]],
+             "Decreasing": [[pi / 2, 3 * pi / 2]]})
+        # The sign is only sampled in the window, so the tails are unknown
+        for function in (Function("sin(x)"), Function("tan(x)")):
+            signs = function.intervals_of_increase_decreasing()
+            self.assertEqual(signs.pop("Unknown"), [[-sp.oo, -100], [100, sp.oo]])
+            self.assertEqual(signs["Increasing"][-1][1], 100)
+            self.assertNotIn(sp.oo, [bound for pieces in signs.values()
+                                     for piece in pieces for bound in piece])
+        # Nor is it where the derivative cannot be evaluated
+        self.assertEqual(Function("abs(x)").intervals_of_increase_decreasing()["Unknown"],
+                         [[-sp.oo, sp.oo]])
+        self.assertEqual(Function("2").concavity(), "Constant function")
+
+    def test_asymptotes(self):
+        """Test the one-sided, horizontal and oblique asymptotes."""
+        self.assertEqual(Function("1/x").asymptotes(), {
+            "vertical_asymptotes": [("x -> 0-", "f(x) -> -oo"), ("x -> 0+", "f(x) -> oo")],
+            "horizontal_asymptote": [("x -> oo", "f(x) -> 0"), ("x -> -oo", "f(x) -> 0")],
+            "oblique_asymptote": [],
+        })
+        asymptotes = Function("x/(x**2 - 1)").asymptotes()
+        self.assertEqual(len(asymptotes["vertical_asymptotes"]), 4)
+        asymptotes = Function("(x**2 + 1)/x").asymptotes()
+        self.assertEqual(asymptotes["horizontal_asymptote"], [])
+        self.assertEqual(asymptotes["oblique_asymptote"],
+                         [("x -> oo", "y = x"), ("x -> -oo", "y = x")])
+        asymptotes = Function("ln(x)").asymptotes()
+        self.assertEqual(asymptotes["vertical_asymptotes"], [("x -> 0+", "f(x) -> -oo")])
+        self.assertEqual(asymptotes["horizontal_asymptote"], [])
+        # Overflowing floats do not hide the limits at infinity
+        asymptotes = Function("sinh(x)/cosh(x)").asymptotes()
+        self.assertEqual(asymptotes["horizontal_asymptote"],
+                         [("x -> oo", "f(x) -> 1"), ("x -> -oo", "f(x) -> -1")])
+        asymptotes = Function("x*exp(x)/(1 + exp(x))").asymptotes()
+        self.assertEqual(asymptotes["oblique_asymptote"], [("x -> oo", "y = x")])
+        self.assertIn(("x -> pi/2-", "f(x) -> oo"),
+                      Function("tan(x)").asymptotes()["vertical_asymptotes"])
+        self.assertEqual(Function("2").asymptotes(), "No asymptotes")
+
+    def test_single_variable(self):
+        """Test the variable of derived functions and multivariable input."""
+        function = Function("x**2 + y**2")
+        for analysis in (function.asymptotes, function.critical_points, function.extrema,
+                         function.concavity, function.analyze):
+            with self.assertRaises(ValueError):
+                analysis()
+        with self.assertRaises(ValueError):
+            function.evaluate(1)
+        with self.assertRaises(ValueError):
+            Function("t*x**2").inflection_points()
+        t = sp.Symbol("t")
+        function = Function("t**3")
+        self.assertEqual(function.diffrentiate(order=3).symbol, t)
+        self.assertEqual([d.symbol for d in function.derivative_tower(order=4)], [t] * 4)
+        self.assertEqual(function.inflection_points(), [0])
+        self.assertEqual(Function("3*t").concavity()["Linear"], [[-sp.oo, sp.oo]])
+        self.assertEqual(Function(5, symbol=t).symbol, t)
+
+    def test_analyze(self):
+        """Test the full analysis report."""
+        report = Function("x**3 - 3*x").analyze(budget=30)
+        self.assertEqual(json.loads(json.dumps(report)), report)
+        self.assertEqual(report["expression"], "x**3 - 3*x")
+        self.assertEqual(report["timed_out"], [])
+        self.assertEqual(report["failed"], {})
+        analyses = report["analyses"]
+        self.assertEqual(analyses["derivatives"], ["3*x**2 - 3", "6*x"])
+        self.assertEqual(analyses["critical_points"], [-1, 1])
+        self.assertEqual(analyses["inflection_points"], [0])
+        self.assertEqual(analyses["monotonicity"]["Decreasing"], [[-1, 1]])
+        self.assertEqual(analyses["concavity"]["Concave Up"], [[0, "oo"]])
+        report = Function("1/x").analyze()
+        self.assertEqual(report["analyses"]["singularities"], [0])
+        self.assertEqual(len(report["analyses"]["asymptotes"]["vertical_asymptotes"]), 2)
+        self.assertEqual(Function("5").analyze()["analyses"]["concavity"],
+                         "Constant function")
+
     # def test_intervals_of_increase_decreasing(self):
     #     """Test the extrema method."""
 
@@ -0,0 +1,39 @@
+"""Test that the DerivativeXpert modules defer their heavy imports."""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_by(module):
+    """Get the modules a fresh interpreter loads when importing a module."""
+    code = f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return set(json.loads(output))
+
+
+class TestImports(unittest.TestCase):
+    """Test cases for the import time work."""
+
+    def test_main(self):
+        """Test that the CLI loads sympy only once a calculator is used."""
+        modules = imported_by("main")
+        for heavy in ("sympy", "numpy", "asyncio", "concurrent.futures", "service.aio"):
+            self.assertNotIn(heavy, modules)
+
+    def test_function(self):
+        """Test that Function loads neither plotting nor the front-ends."""
+        modules = imported_by("advanced_calc.function")
+        for heavy in ("matplotlib", "plot.plot", "advanced_calc.derivative", "asyncio",
+                      "sqlite3", "concurrent.futures", "service.jobs"):
+            self.assertNotIn(heavy, modules)
+        self.assertNotIn("plot.plot", imported_by("advanced_calc.derivative"))
+
+
+if __name__ == "__main__":
+    unittest.main()
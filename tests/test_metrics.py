@@ -0,0 +1,52 @@
+"""Test the profiling metrics of the DerivativeXpert package."""
+
+import unittest
+from sympy.abc import x
+from advanced_calc import metrics
+from advanced_calc.function import Function
+from advanced_calc.timeout import run_with_budget
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the metrics module."""
+
+    def setUp(self):
+        """Start from no recorded stage."""
+        metrics.reset()
+
+    def tearDown(self):
+        """Stop recording."""
+        metrics.disable()
+        metrics.reset()
+
+    def test_disabled(self):
+        """Test that nothing is recorded while disabled."""
+        self.assertIs(metrics.stage("a"), metrics.stage("b"))
+        with metrics.stage("a", x**2):
+            pass
+        self.assertEqual(metrics.report(), {})
+
+    def test_stages(self):
+        """Test the recorded calls, times and expression sizes."""
+        metrics.enable()
+        with metrics.stage("a", x**2 + 1):
+            pass
+        with metrics.stage("a"):
+            pass
+        stats = metrics.report()["a"]
+        self.assertEqual(stats["calls"], 2)
+        self.assertEqual(stats["max_size"], 5)
+        self.assertGreaterEqual(stats["seconds"], stats["max_seconds"])
+        self.assertIn("a", metrics.format_report())
+
+    def test_operations(self):
+        """Test the stages of the calculus operations, in workers too."""
+        metrics.enable()
+        function = Function("x**3 - 3*x + 1/(x + 7)")
+        run_with_budget(function.critical_points, 30)
+        self.assertIn("solveset", metrics.report())
+        self.assertIn("sympify", metrics.report())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Test the numeric helpers of the DerivativeXpert package."""
+
+import unittest
+import numpy as np
+import sympy as sp
+from sympy.abc import x
+from advanced_calc.numeric import (
+    compile_expression, compile_expressions, find_roots, set_mask, sign_table)
+
+
+class TestNumeric(unittest.TestCase):
+    """Test cases for the numeric helpers."""
+
+    def test_compile_expression(self):
+        """Test the compiled evaluators."""
+        evaluate = compile_expression(sp.sqrt(x), [x])
+        np.testing.assert_allclose(evaluate([-1, 4]), [np.nan, 2])
+        evaluate = compile_expression(sp.LambertW(x), [x])
+        self.assertAlmostEqual(evaluate([1.0])[0], 0.567143, places=6)
+        self.assertEqual(compile_expression(sp.Integer(3), [x])([1, 2]).tolist(), [3, 3])
+
+    def test_compile_expressions(self):
+        """Test the jointly compiled evaluators."""
+        evaluate = compile_expressions([sp.sin(x) ** 2, sp.sin(x) ** 3, sp.Integer(1)], [x])
+        result = evaluate([0, np.pi / 2])
+        self.assertEqual(result.shape, (3, 2))
+        np.testing.assert_allclose(result, [[0, 1], [0, 1], [1, 1]], atol=1e-12)
+        evaluate = compile_expressions([sp.LambertW(x), sp.log(x)], [x])
+        np.testing.assert_allclose(evaluate([1.0, -1.0])[1], [0, np.nan])
+
+    def test_set_mask(self):
+        """Test the vectorized set membership."""
+        values = np.array([-2, -1, 0, 1, np.pi / 2])
+        domain = sp.Union(sp.Interval.open(-sp.oo, -1), sp.Interval.Lopen(0, 2))
+        self.assertEqual(set_mask(domain, values).tolist(), [True, False, False, True, True])
+        lattice = sp.ImageSet(sp.Lambda(x, sp.pi * x + sp.pi / 2), sp.S.Integers)
+        mask = set_mask(sp.Complement(sp.S.Reals, lattice), values)
+        self.assertEqual(mask.tolist(), [True, True, True, True, False])
+
+    def test_find_roots(self):
+        """Test the numeric root finder."""
+        roots = find_roots(np.sin, -4, 4, np.cos)
+        np.testing.assert_allclose(roots, [-np.pi, 0, np.pi], atol=1e-12)
+        self.assertEqual(find_roots(lambda v: v**2, -1, 2, lambda v: 2 * v), [0.0])
+        self.assertEqual(find_roots(lambda v: 1 / v, -1, 2), [])
+        self.assertAlmostEqual(find_roots(lambda v: np.cos(v) - v, 0, 1)[0], 0.739085, places=6)
+
+    def test_sign_table(self):
+        """Test the sign of a function on intervals."""
+        intervals = [[-sp.oo, -1], [-1, 1], [1, sp.oo], [2, 3]]
+        signs = sign_table(lambda v: v**2 - 1, intervals)
+        self.assertEqual(signs.tolist(), [1, -1, 1, 1])
+        signs = sign_table(lambda v: np.where(v > 0, 0.0, np.nan), [[0, 1], [-1, 0]])
+        self.assertEqual(signs[0], 0)
+        self.assertTrue(np.isnan(signs[1]))
+        self.assertEqual(len(sign_table(np.sin, [])), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
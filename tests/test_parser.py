@@ -0,0 +1,50 @@
+"""Test the shared parser of the DerivativeXpert package."""
+
+import os
+import tempfile
+import unittest
+from sympy import SympifyError
+from sympy.abc import x
+from advanced_calc.parser import PARSE_CACHE, parse
+
+
+class TestParse(unittest.TestCase):
+    """Test cases for the parse function."""
+
+    def test_parse(self):
+        """Test that parsing is cached by the normalized input."""
+        PARSE_CACHE.clear()
+        self.assertEqual(parse("x^2 + 1"), x**2 + 1)
+        self.assertIs(parse("  x^2  +   1 "), parse("x^2 + 1"))
+        self.assertEqual(PARSE_CACHE.info()["misses"], 1)
+        self.assertEqual(parse(x + 1), x + 1)
+
+    def test_parse_error(self):
+        """Test that parse errors are cached and raised again."""
+        PARSE_CACHE.clear()
+        for _ in range(2):
+            with self.assertRaises(SympifyError):
+                parse("ln(x))")
+        self.assertEqual(PARSE_CACHE.info()["hits"], 1)
+
+    def test_parse_is_restricted(self):
+        """Test that parsing does not run arbitrary code."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "PWNED")
+            payloads = [
+                f"__import__('os').system('touch {path}')",
+                f"x.func.__globals__['os'].system('touch {path}')",
+                f"sympify('open(\\'{path}\\', \\'w\\')')",
+                "(1).real",
+            ]
+            for payload in payloads:
+                with self.assertRaises(SympifyError):
+                    parse(payload)
+            self.assertFalse(os.path.exists(path))
+        self.assertEqual(parse("eval(x)").func.__name__, "eval")
+        with self.assertRaises(SympifyError):
+            parse(["x"])
+
+
+if __name__ == "__main__":
+    unittest.main()
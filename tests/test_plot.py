@@ -0,0 +1,73 @@
+"""Test the plotting helpers of the DerivativeXpert package."""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from advanced_calc.function import Function
+from plot.plot import Plotter
+from plot.sampling import sample, sample_bounds, y_limits
+
+
+class TestSampling(unittest.TestCase):
+    """Test cases for the adaptive sampling engine."""
+
+    def test_bounds(self):
+        """Test that the sampling window is clipped to the domain."""
+        self.assertEqual(sample_bounds(Function("ln(x)")), (0.0, 100.0))
+        self.assertEqual(sample_bounds(Function("sqrt(1-x**2)")), (-1.0, 1.0))
+        self.assertEqual(sample_bounds(Function("x"), (-2, 3)), (-2.0, 3.0))
+
+    def test_sample(self):
+        """Test the refinement and the breaks at singularities."""
+        x, y = sample(Function("x^2"), (-1, 1))
+        self.assertEqual(len(x), 200)
+        self.assertTrue(np.all(np.diff(x) > 0))
+        x, y = sample(Function("tan(x)"), (-5, 5))
+        self.assertEqual(np.isnan(y).sum(), 4)
+        self.assertGreater(len(x), 200)
+        x, y = sample(Function("1/x"), (-1, 2))
+        self.assertEqual(np.isnan(y).sum(), 1)
+        self.assertTrue(np.all(np.diff(x) > 0))
+
+    def test_y_limits(self):
+        """Test that poles do not stretch the vertical limits."""
+        _, y = sample(Function("tan(x)"))
+        low, high = y_limits(y)
+        self.assertLess(high - low, 1000)
+        self.assertEqual(y_limits(np.array([2.0, 2.0])), (1.0, 3.0))
+        self.assertIsNone(y_limits(np.array([np.nan])))
+
+
+class TestPlotter(unittest.TestCase):
+    """Test cases for the headless rendering of the Plotter class."""
+
+    def test_render(self):
+        """Test rendering to bytes and to files."""
+        self.assertTrue(Plotter.render(Function("x^2")).startswith(b"\x89PNG"))
+        with tempfile.TemporaryDirectory() as directory:
+            paths = Plotter.render_batch(
+                ["ln(x)", Function("tan(x)")], directory=directory, fmt="svg")
+            self.assertEqual(
+                paths, [os.path.join(directory, f"plot_{i}.svg") for i in range(2)])
+            self.assertTrue(all(os.path.getsize(path) for path in paths))
+        with self.assertRaises(ValueError):
+            Plotter.render(None)
+
+    def test_derivative_overlay(self):
+        """Test drawing a function and its derivatives on shared axes."""
+        from matplotlib.figure import Figure
+
+        function = Function("x**3")
+        axes = Figure().add_subplot()
+        Plotter.draw(axes, function, (-2, 2), order=3)
+        lines = axes.get_lines()
+        self.assertEqual(len(lines), 4)
+        x = lines[0].get_xdata()
+        self.assertTrue(all(np.array_equal(line.get_xdata(), x) for line in lines))
+        np.testing.assert_allclose(lines[2].get_ydata(), 6 * x)
+        self.assertIs(function.diffrentiate(order=3), function.derivative_tower(3)[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
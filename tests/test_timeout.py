@@ -0,0 +1,105 @@
+"""Test the time budgets of the DerivativeXpert package."""
+
+import os
+import signal
+import threading
+import time
+import unittest
+from unittest import mock
+import sympy as sp
+from advanced_calc.function import Function
+from advanced_calc.timeout import (
+    TIMEOUT, call_with_timeout, map_with_budget, run_with_budget)
+
+
+class TestBudget(unittest.TestCase):
+    """Test cases for the time-budgeted execution."""
+
+    def test_run_with_budget(self):
+        """Test that slow calls are killed and errors are raised."""
+        start = time.perf_counter()
+        self.assertIs(run_with_budget(time.sleep, 0.2, 10), TIMEOUT)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(run_with_budget(pow, 5, 2, 10), 1024)
+        self.assertEqual(run_with_budget(pow, None, 2, 3), 8)
+        with self.assertRaises(ZeroDivisionError):
+            run_with_budget(divmod, 5, 1, 0)
+        self.assertEqual(call_with_timeout(time.sleep, 0.2, "late", 10), "late")
+
+    def test_call_with_timeout(self):
+        """Test that timed calls run in this process and may be nested."""
+        self.assertEqual(call_with_timeout(os.getpid, 5, None), os.getpid())
+        start = time.perf_counter()
+        self.assertEqual(call_with_timeout(
+            call_with_timeout, 0.3, "outer", time.sleep, 10, "inner", 10), "outer")
+        self.assertEqual(call_with_timeout(
+            call_with_timeout, 5, "outer", time.sleep, 0.1, "inner", 10), "inner")
+        self.assertLess(time.perf_counter() - start, 5)
+        # The timer may fire before the call starts
+        for _ in range(20):
+            self.assertEqual(call_with_timeout(time.sleep, 1e-6, "late", 0.001), "late")
+        self.assertIs(signal.getsignal(signal.SIGALRM), signal.SIG_DFL)
+        outcomes = []
+        thread = threading.Thread(
+            target=lambda: outcomes.append(call_with_timeout(time.sleep, 0.2, "late", 10)))
+        thread.start()
+        thread.join()
+        self.assertEqual(outcomes, ["late"])
+
+    def test_map_with_budget(self):
+        """Test that concurrent calls time out and fail independently."""
+        start = time.perf_counter()
+        outcomes = map_with_budget(time.sleep, [(0,), (10,), (0,)], 0.5)
+        self.assertEqual(outcomes, [None, TIMEOUT, None])
+        self.assertLess(time.perf_counter() - start, 5)
+        quotient, error = map_with_budget(divmod, [(7, 2), (1, 0)], 5, workers=1)
+        self.assertEqual(quotient, (3, 1))
+        self.assertIsInstance(error, ZeroDivisionError)
+
+    def test_analysis_budget(self):
+        """Test the budget argument of the analysis methods."""
+        function = Function("x**3 - 3*x")
+        self.assertEqual(function.critical_points(budget=30), [-1, 1])
+        self.assertEqual(function.inflection_points(budget=30), [0])
+        # The work of the workers is kept, so nothing runs again
+        self.assertEqual(function.critical_points(budget=1e-9), [-1, 1])
+        self.assertTrue(any(str(key).startswith("critical_points(")
+                            for key in function.value.attachments()))
+        function.diff = None
+        self.assertEqual(str(function.diffrentiate(order=2).expression), "6*x")
+        maximum, minimum = Function("x**x*sin(x)").extrema(interval=[1, 5])
+        self.assertAlmostEqual(maximum, 6.254, places=3)
+        self.assertLess(minimum, -2996)
+        # Unbounded beyond the window, or at the poles inside it
+        self.assertEqual(Function("tan(x)").extrema(), (sp.oo, -sp.oo))
+        self.assertEqual(Function("x*sin(x)").extrema(), (sp.oo, -sp.oo))
+        maximum, minimum = Function("atan(x)*sin(x)**2").extrema()
+        self.assertLess(maximum, 1.571)
+        self.assertGreater(minimum, -1.571)
+
+    def test_unknown_singularities(self):
+        """Test that singularities that timed out are not taken as none."""
+        singularities = sp.singularities
+
+        def slow(*args):
+            time.sleep(1)
+            return singularities(*args)
+
+        function = Function("1/(x - 7)")
+        function.analysis_timeout = 0.2
+        with mock.patch("sympy.singularities", slow):
+            self.assertIs(function.asymptotes(), TIMEOUT)
+            self.assertEqual(function.analyze()["timed_out"][0], "singularities")
+        self.assertEqual(len(Function("1/(x - 7)").asymptotes()["vertical_asymptotes"]), 2)
+
+    def test_unknown_limits(self):
+        """Test that asymptotes missing a limit are not kept."""
+        function = Function("exp(x)/(1 + exp(x)) + 1/(x - 9)")
+        with mock.patch("advanced_calc.function.cached_limits",
+                        lambda requests, budget: [None] * len(requests)):
+            self.assertIs(function.asymptotes(), TIMEOUT)
+        self.assertEqual(len(function.asymptotes()["horizontal_asymptote"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""Test the function values of the DerivativeXpert package."""
+
+import pickle
+import sys
+import unittest
+import sympy as sp
+from sympy.abc import x
+from advanced_calc.function import Function
+from advanced_calc.value import FunctionValue, interned
+
+
+class TestFunctionValue(unittest.TestCase):
+    """Test cases for the FunctionValue class."""
+
+    def test_interning(self):
+        """Test that equal expressions share one immutable value."""
+        value = FunctionValue("x**2 - 1")
+        self.assertIs(FunctionValue("x^2 -  1"), value)
+        self.assertIs(FunctionValue(x**2 - 1), value)
+        self.assertIs(pickle.loads(pickle.dumps(value)), value)
+        self.assertEqual(len({value, FunctionValue("x**2 - 1"), FunctionValue("x")}), 2)
+        self.assertEqual(value.symbols, (x,))
+        with self.assertRaises(AttributeError):
+            value.expression = x
+        with self.assertRaises(ValueError):
+            FunctionValue("x +* 1")
+        count = interned()
+        del value
+        self.assertEqual(interned(), count - 1)
+
+    def test_analyses(self):
+        """Test that analyses are computed once and shared."""
+        value = FunctionValue("x**3 - 3*x")
+        self.assertEqual(value.domain, sp.Reals)
+        self.assertIs(value.analysis("critical_points"),
+                      FunctionValue("x**3 - 3*x").analysis("critical_points"))
+        self.assertEqual(value.analysis("critical_points", interval=(0, 5)), [1])
+        self.assertIs(value.derivative(), FunctionValue("3*x**2 - 3"))
+        self.assertIs(value.derivative(2), FunctionValue(6*x))
+        value.forget()
+        self.assertEqual(value.analysis("critical_points"), [-1, 1])
+
+    def test_function(self):
+        """Test the conversions between Function and FunctionValue."""
+        function = Function(FunctionValue("sin(x)"))
+        self.assertEqual(function.expression, sp.sin(x))
+        self.assertIs(function.value, FunctionValue("sin(x)"))
+        self.assertLess(sys.getsizeof(function.value),
+                        sys.getsizeof(function) + sys.getsizeof(vars(function)))
+
+
+if __name__ == "__main__":
+    unittest.main()